@@ -0,0 +1,151 @@
+# backend/clicks_store.py
+import glob
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Version du format du snapshot (à incrémenter si le contenu stocké change)
+SNAPSHOT_FORMAT_VERSION = 3
+
+# Schéma compact des colonnes de clics, appliqué dès la lecture des CSV.
+# click_timestamp (ms) est l'unique représentation temporelle conservée.
+CLICKS_SCHEMA = {
+    'user_id': 'int32',
+    'session_id': 'int64',
+    'session_start': 'int64',
+    'session_size': 'int16',
+    'click_article_id': 'int32',
+    'click_timestamp': 'int64',
+    'click_environment': 'int8',
+    'click_deviceGroup': 'int8',
+    'click_os': 'int16',
+    'click_country': 'int8',
+    'click_region': 'int16',
+    'click_referrer_type': 'int8'
+}
+SNAPSHOT_FILENAME = "clicks_snapshot.npz"
+
+_MANIFEST_KEY = "__manifest__"
+_COLUMNS_KEY = "__columns__"
+
+
+def list_click_files(clicks_path: Path) -> List[str]:
+    """Liste triée des fichiers horaires de clics"""
+    return sorted(glob.glob(str(clicks_path / "clicks_hour_*.csv")))
+
+
+def _read_click_file(file_path: str) -> Tuple[str, Optional[pd.DataFrame], Optional[str]]:
+    """Lit un fichier horaire (exécuté dans un processus du pool)"""
+    try:
+        return file_path, pd.read_csv(file_path, dtype=CLICKS_SCHEMA), None
+    except Exception as e:
+        return file_path, None, str(e)
+
+
+def resolve_workers(workers: int) -> int:
+    """Nombre de processus effectif (0 = tous les cœurs)"""
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def read_click_files(click_files: List[str], workers: int = 1) -> Tuple[pd.DataFrame, List[str]]:
+    """Lit les fichiers de clics, en parallèle si workers > 1
+
+    Returns:
+        (interactions concaténées, fichiers en erreur)
+    """
+    workers = min(resolve_workers(workers), max(len(click_files), 1))
+
+    if workers > 1:
+        # Plusieurs fichiers par tâche pour amortir la sérialisation inter-processus
+        chunksize = max(1, len(click_files) // (workers * 4))
+        # "spawn" : pas de fork d'un serveur multi-threadé (verrous hérités dans les enfants)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            results = list(executor.map(_read_click_file, click_files, chunksize=chunksize))
+        logger.info(f"⚙️ {len(click_files)} fichiers de clics lus sur {workers} processus")
+    else:
+        results = [_read_click_file(file_path) for file_path in click_files]
+
+    dfs = []
+    failed_files = []
+    for file_path, df, error in results:
+        if error is not None:
+            failed_files.append(file_path)
+            logger.error(f"❌ Erreur {file_path}: {error}")
+        # Inutile de concaténer les fichiers horaires vides
+        elif len(df) > 0:
+            dfs.append(df)
+    del results
+
+    if not dfs:
+        return pd.DataFrame(), failed_files
+
+    # Une seule concaténation, directement dans les blocs finaux
+    return pd.concat(dfs, ignore_index=True), failed_files
+
+
+def build_manifest(click_files: List[str]) -> Dict:
+    """Empreinte des fichiers sources (nom, taille, date de modification)"""
+    files = []
+    for file_path in click_files:
+        stat = os.stat(file_path)
+        files.append({
+            "name": os.path.basename(file_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns
+        })
+
+    return {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "schema": CLICKS_SCHEMA,
+        "files": files
+    }
+
+
+def save_snapshot(interactions: pd.DataFrame, snapshot_path: Path, manifest: Dict) -> None:
+    """Écrit les interactions dans un fichier binaire colonnaire (une entrée .npy par colonne)"""
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+
+    arrays = {column: interactions[column].to_numpy() for column in interactions.columns}
+    arrays[_COLUMNS_KEY] = np.array(list(interactions.columns))
+    arrays[_MANIFEST_KEY] = np.frombuffer(json.dumps(manifest).encode("utf-8"), dtype=np.uint8)
+
+    # Écriture atomique : un lecteur concurrent ne voit jamais un fichier partiel
+    tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, snapshot_path)
+
+    size_mb = snapshot_path.stat().st_size / 1024 ** 2
+    logger.info(f"💾 Snapshot des clics écrit: {snapshot_path} ({len(interactions):,} lignes, {size_mb:.1f} MB)")
+
+
+def load_snapshot(snapshot_path: Path, manifest: Dict) -> Optional[pd.DataFrame]:
+    """Charge le snapshot s'il correspond aux fichiers sources, None sinon"""
+    if not snapshot_path.exists():
+        logger.info("📁 Aucun snapshot des clics, lecture des CSV")
+        return None
+
+    try:
+        with np.load(snapshot_path, allow_pickle=False) as data:
+            stored_manifest = json.loads(data[_MANIFEST_KEY].tobytes().decode("utf-8"))
+            if stored_manifest != manifest:
+                logger.info("🔄 Fichiers de clics modifiés, snapshot à reconstruire")
+                return None
+
+            columns = [str(column) for column in data[_COLUMNS_KEY]]
+            return pd.DataFrame({column: data[column] for column in columns})
+
+    except Exception as e:
+        logger.error(f"❌ Snapshot illisible {snapshot_path}: {e}")
+        return None
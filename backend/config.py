@@ -7,6 +7,7 @@ from datetime import datetime
 class Settings(BaseSettings):
     # Chemins
     DATA_PATH: Path = Path("data")  # Relatif à backend/
+    CACHE_PATH: Path = Path("data/cache")  # Fichiers dérivés (snapshots, index)
     
     # Paramètres temporels (auto-adaptés aux données)
     POPULARITY_WINDOW_DAYS: int = 90  # 90 jours pour la popularité
@@ -30,10 +31,73 @@ class Settings(BaseSettings):
     
     # Fréquence de mise à jour des clusters (en heures)
     CLUSTER_UPDATE_FREQUENCY_HOURS: int = 24
+    # Mode incrémental : après chaque ingestion de clics, centroïdes mis à jour par
+    # mini-lots sur les seuls utilisateurs touchés, qui sont réassignés ; entraînement
+    # complet à la demande ou quand un centroïde a dérivé de plus de
+    # CLUSTER_DRIFT_THRESHOLD × la plus petite distance entre centroïdes
+    CLUSTER_MODE: str = "full"  # "full" | "incremental"
+    CLUSTER_MINIBATCH_SIZE: int = 1024
+    CLUSTER_DRIFT_THRESHOLD: float = 0.25
+    # Réentraînement d'un modèle périmé en arrière-plan (K-means dans un processus
+    # séparé), l'ancien modèle servant jusqu'à la publication du nouveau ;
+    # vérification périodique de la fraîcheur (0 = désactivée)
+    CLUSTER_TRAINING_PROCESS: bool = True
+    CLUSTER_SCHEDULER_INTERVAL_MINUTES: float = 10
+    CLUSTER_RETRY_DELAY_SECONDS: float = 300
     
     # Date de référence (auto-détectée si None)
     REFERENCE_DATE: Optional[datetime] = None
     
+    # Snapshot binaire des clics (reconstruit si les CSV changent)
+    CLICKS_SNAPSHOT_ENABLED: bool = True
+    
+    # Processus pour la lecture des fichiers de clics (1 = séquentiel, 0 = tous les cœurs)
+    CLICKS_INGEST_WORKERS: int = 1
+    
+    # Embeddings mappés en mémoire depuis un .npy (partagés entre workers)
+    EMBEDDINGS_MMAP: bool = True
+    
+    # Workers uvicorn (python3 main.py) : au-delà de 1, les données sont construites
+    # une fois par le processus parent et partagées en mémoire entre les workers
+    API_WORKERS: int = 1
+    
+    # Recherche des candidats par contenu : "exact" (scan complet), "ivf" (index
+    # approché persisté dans CACHE_PATH, construit au premier usage) ou "neighbors"
+    # (table des voisins précalculée par scripts/build_item_neighbors.py)
+    CONTENT_RETRIEVAL: str = "exact"
+    CONTENT_IVF_NLIST: int = 0      # Listes de l'index (0 = racine carrée du nombre de candidats)
+    CONTENT_IVF_NPROBE: int = 16    # Listes sondées par requête : rappel ↑, latence ↑
+    CONTENT_NEIGHBORS_K: int = 50   # Voisins précalculés par article
+    # Candidats résidents en int8 (4x moins de mémoire) : scan approché puis
+    # re-classement exact des CONTENT_RERANK_SIZE meilleurs ("none" = float32)
+    CONTENT_QUANTIZATION: str = "none"
+    CONTENT_RERANK_SIZE: int = 200
+    # Scoring dans un espace réduit : projection "pca" ou "random" ajustée une fois
+    # (scripts/fit_projection.py) vers CONTENT_PROJECTION_DIM dimensions ("none" = 250-d)
+    CONTENT_PROJECTION: str = "none"
+    CONTENT_PROJECTION_DIM: int = 64
+    
+    # Profils utilisateurs (recommandation par contenu) : cache LRU invalidé au
+    # prochain clic de l'utilisateur (0 = désactivé), et demi-vie de la pondération
+    # des clics par ancienneté (0 = moyenne simple des 10 derniers clics)
+    PROFILE_CACHE_SIZE: int = 50_000
+    PROFILE_DECAY_HALF_LIFE_HOURS: float = 0.0
+    # Profils précalculés (scripts/build_user_profiles.py), lus tant que l'utilisateur n'a pas recliqué
+    PROFILE_MATRIX_ENABLED: bool = True
+    
+    # Préchauffage au démarrage (données, index, recommandeurs, clusters) ; /ready
+    # répond 503 tant qu'il n'est pas terminé. Bloquant : le serveur n'accepte
+    # aucune connexion avant la fin du préchauffage
+    WARMUP_ENABLED: bool = True
+    WARMUP_BLOCKING: bool = False
+    # Phases en échec relancées en arrière-plan (délai doublé à chaque essai) ;
+    # 0 = pas de nouvel essai, l'instance reste non prête jusqu'au redémarrage
+    WARMUP_RETRY_DELAY_SECONDS: float = 5
+    WARMUP_RETRY_MAX_DELAY_SECONDS: float = 300
+    
+    # Manifeste JSON du segment partagé (positionné par le processus parent)
+    SHARED_DATA_MANIFEST: Optional[str] = None
+    
     class Config:
         env_file = ".env"
 
@@ -1,13 +1,18 @@
 # backend/data_loader.py
 import pandas as pd
-import pickle
 import numpy as np
+import os
+import json
 from pathlib import Path
-import glob
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Set, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 from config import settings
+import clicks_store
+import embeddings_store
+from indexes import UserIndex, ArticleStore
+from loading import LoadTracker
+from shared_data import SharedDataPlane, frame_arrays
 
 logger = logging.getLogger(__name__)
 
@@ -18,11 +23,26 @@ class DataLoader:
         self.data_path = settings.DATA_PATH
         self._articles_metadata = None
         self._articles_embeddings = None
-        self._user_interactions = None
+        # (interactions triées, index CSR) : publiés ensemble en une seule affectation
+        self._interactions_state = None
+        self._ingested_files = set()
+        self._interactions_filtered = False
+        self._data_version = 0
+        # Utilisateurs ayant reçu des clics par ingestion, en attente de take_updated_users()
+        # (seul le clustering incrémental les consomme : non enregistrés sinon)
+        self._updated_users = []
+        self._popularity_leaderboards = {}
+        self._popularity_cache_hits = 0
+        self._popularity_cache_misses = 0
+        self._article_store = None
         self._user_clusters = None
         self._cluster_update_time = None
         self._reference_date = None
         self._recommendable_articles = None
+        # Chargements en vol unique : un seul thread charge, les autres attendent
+        self.loads = LoadTracker()
+        # Segment de mémoire partagée publié par le processus parent (mode multi-workers)
+        self._shared_data = None
         
     def _get_reference_date(self) -> datetime:
         """Détecte automatiquement la date de référence (date max des données)"""
@@ -45,103 +65,425 @@ class DataLoader:
     def load_articles_metadata(self) -> pd.DataFrame:
         """Charge les métadonnées des articles avec filtrage qualité"""
         if self._articles_metadata is None:
-            metadata_path = self.data_path / "articles_metadata.csv"
-            df = pd.read_csv(metadata_path)
-            
-            # Filtrage par nombre de mots
-            before_filter = len(df)
-            df = df[df['words_count'] >= settings.MIN_WORDS_COUNT].copy()
-            after_filter = len(df)
-            logger.info(f"📝 Filtrage articles courts: {before_filter:,} → {after_filter:,} articles ({before_filter-after_filter:,} supprimés)")
-            
-            # Ajout de la date de création
-            df['created_date'] = pd.to_datetime(df['created_at_ts'], unit='ms')
-            
-            self._articles_metadata = df
-            logger.info(f"📊 Métadonnées chargées: {len(df):,} articles")
-            
+            self.loads.ensure(
+                "articles_metadata",
+                self._load_articles_metadata,
+                is_loaded=lambda: self._articles_metadata is not None
+            )
         return self._articles_metadata
     
+    def _load_articles_metadata(self):
+        shared = self._get_shared_data()
+        if shared is not None:
+            self._article_store = ArticleStore(
+                shared.group("article_store"), shared.array("article_store.present")
+            )
+            self._articles_metadata = shared.frame("articles_metadata")
+            logger.info(f"📊 Métadonnées attachées (mémoire partagée): {len(self._articles_metadata):,} articles")
+            return
+        
+        metadata_path = self.data_path / "articles_metadata.csv"
+        df = pd.read_csv(metadata_path)
+        
+        # Filtrage par nombre de mots
+        before_filter = len(df)
+        df = df[df['words_count'] >= settings.MIN_WORDS_COUNT].copy()
+        after_filter = len(df)
+        logger.info(f"📝 Filtrage articles courts: {before_filter:,} → {after_filter:,} articles ({before_filter-after_filter:,} supprimés)")
+        
+        # Ajout de la date de création
+        df['created_date'] = pd.to_datetime(df['created_at_ts'], unit='ms')
+        
+        # Le store d'abord : _articles_metadata non nul signifie « tout est prêt »
+        self._article_store = ArticleStore.from_metadata(df)
+        self._articles_metadata = df
+        logger.info(f"📊 Métadonnées chargées: {len(df):,} articles")
+    
     def load_articles_embeddings(self) -> np.ndarray:
         """Charge les embeddings des articles"""
         if self._articles_embeddings is None:
-            embeddings_path = self.data_path / "articles_embeddings.pickle"
-            with open(embeddings_path, 'rb') as f:
-                self._articles_embeddings = pickle.load(f)
-            logger.info(f"🔢 Embeddings chargés: {self._articles_embeddings.shape}")
+            self.loads.ensure(
+                "articles_embeddings",
+                self._load_articles_embeddings,
+                is_loaded=lambda: self._articles_embeddings is not None
+            )
         return self._articles_embeddings
     
+    def get_article_embeddings(self, article_ids) -> Tuple[np.ndarray, np.ndarray]:
+        """Embeddings des article_id connus, et masque de ces articles aligné sur l'entrée"""
+        embeddings = self.load_articles_embeddings()
+        article_ids = np.asarray(article_ids, dtype=np.int64)
+        known = (article_ids >= 0) & (article_ids < len(embeddings))
+        return embeddings[article_ids[known]], known
+    
+    def _load_articles_embeddings(self):
+        embeddings_path = self.data_path / "articles_embeddings.pickle"
+        npy_path = settings.CACHE_PATH / embeddings_store.EMBEDDINGS_NPY_FILENAME
+        self._articles_embeddings = embeddings_store.load_embeddings(
+            embeddings_path, npy_path, mmap=settings.EMBEDDINGS_MMAP
+        )
+        logger.info(f"🔢 Embeddings chargés: {self._articles_embeddings.shape}"
+                    f"{' (mmap)' if settings.EMBEDDINGS_MMAP else ''}")
+    
     def get_recommendable_articles(self) -> pd.DataFrame:
         """Récupère les articles recommandables (< 2 ans et > 50 mots)"""
-        if self._recommendable_articles is None:
-            metadata = self.load_articles_metadata()
-            reference_date = self._get_reference_date()
-            cutoff_date = reference_date - timedelta(days=settings.MAX_ARTICLE_AGE_DAYS)
-            
-            # Filtrage par âge
-            recommendable = metadata[metadata['created_date'] >= cutoff_date].copy()
+        recommendable = self._recommendable_articles
+        if recommendable is None:
+            self.loads.ensure(
+                "recommendable_articles",
+                self._load_recommendable_articles,
+                is_loaded=lambda: self._recommendable_articles is not None
+            )
+            recommendable = self._recommendable_articles
             
-            logger.info(f"📅 Articles recommandables: {len(recommendable):,} (depuis {cutoff_date.strftime('%Y-%m-%d')})")
-            self._recommendable_articles = recommendable
-            
-        return self._recommendable_articles
+        return recommendable
+    
+    def _load_recommendable_articles(self):
+        metadata = self.load_articles_metadata()
+        reference_date = self._get_reference_date()
+        cutoff_date = reference_date - timedelta(days=settings.MAX_ARTICLE_AGE_DAYS)
+        
+        # Filtrage par âge
+        recommendable = metadata[metadata['created_date'] >= cutoff_date].copy()
+        
+        logger.info(f"📅 Articles recommandables: {len(recommendable):,} (depuis {cutoff_date.strftime('%Y-%m-%d')})")
+        self._recommendable_articles = recommendable
     
     def load_user_interactions(self, reload: bool = False) -> pd.DataFrame:
         """Charge toutes les interactions utilisateurs"""
-        if self._user_interactions is None or reload:
-            clicks_path = self.data_path / "clicks"
-            click_files = glob.glob(str(clicks_path / "clicks_hour_*.csv"))
-            
-            dfs = []
-            for file_path in click_files:
-                try:
-                    df = pd.read_csv(file_path)
-                    dfs.append(df)
-                except Exception as e:
-                    logger.error(f"❌ Erreur {file_path}: {e}")
+        return self._get_interactions_state(reload)[0]
+    
+    def _get_interactions_state(self, reload: bool = False) -> Tuple[pd.DataFrame, UserIndex]:
+        """Couple (interactions, index CSR) cohérent, chargé au besoin"""
+        state = self._interactions_state
+        if state is None or reload:
+            # reload : chaque appelant force un rechargement, sans vol unique
+            self.loads.ensure(
+                "user_interactions",
+                self._load_user_interactions,
+                is_loaded=(lambda: False) if reload else (lambda: self._interactions_state is not None)
+            )
+            state = self._interactions_state
+        return state
+    
+    def _load_user_interactions(self):
+        # Rechargement complet : les mises à jour incrémentales en attente sont caduques
+        self._updated_users = []
+        shared = self._get_shared_data()
+        if shared is not None:
+            self._ingested_files = set(shared.meta["ingested_files"])
+            self._interactions_filtered = shared.meta["interactions_filtered"]
+            interactions = shared.frame("interactions")
+            self._interactions_state = (interactions, UserIndex(shared.array("user_index.offsets")))
+            self._data_version += 1
+            logger.info(f"🔗 Interactions attachées (mémoire partagée): {len(interactions):,}")
+            return
+        
+        clicks_path = self.data_path / "clicks"
+        click_files = clicks_store.list_click_files(clicks_path)
+        all_interactions, failed_files = self._read_click_files(click_files)
+        self._ingested_files = {
+            os.path.basename(file_path) for file_path in click_files if file_path not in failed_files
+        }
+        
+        if len(all_interactions) > 0:
+            # Filtrage des interactions sur articles recommandables uniquement après chargement
+            # pour éviter la récursion lors de l'auto-détection de date
+            self._interactions_filtered = self._recommendable_articles is not None
+            if self._interactions_filtered:
+                all_interactions = self._filter_recommendable_interactions(all_interactions)
             
-            if dfs:
-                all_interactions = pd.concat(dfs, ignore_index=True)
-                all_interactions['click_datetime'] = pd.to_datetime(
-                    all_interactions['click_timestamp'], unit='ms'
-                )
-                
-                # Filtrage des interactions sur articles recommandables uniquement après chargement
-                # pour éviter la récursion lors de l'auto-détection de date
-                if self._recommendable_articles is not None:
-                    recommendable_ids = set(self._recommendable_articles['article_id'].tolist())
-                    before_filter = len(all_interactions)
-                    all_interactions = all_interactions[
-                        all_interactions['click_article_id'].isin(recommendable_ids)
-                    ]
-                    after_filter = len(all_interactions)
-                    logger.info(f"🔗 Interactions filtrées: {after_filter:,} (supprimées: {before_filter-after_filter:,})")
-                
-                self._user_interactions = all_interactions
-                logger.info(f"🔗 Interactions chargées: {len(all_interactions):,}")
-            else:
-                self._user_interactions = pd.DataFrame()
-                
-        return self._user_interactions
+            # Index CSR : l'historique d'un utilisateur devient une tranche contiguë
+            all_interactions = UserIndex.sort_interactions(all_interactions)
+            self._interactions_state = (
+                all_interactions, UserIndex.build(all_interactions['user_id'].to_numpy())
+            )
+            logger.info(f"🔗 Interactions chargées: {len(all_interactions):,}")
+        else:
+            self._interactions_state = (pd.DataFrame(), UserIndex.build(np.zeros(0, dtype=np.int64)))
+        self._data_version += 1
     
-    def get_user_history(self, user_id: int, limit: int = None) -> pd.DataFrame:
-        """Récupère l'historique d'un utilisateur"""
+    def publish_shared_data(self) -> SharedDataPlane:
+        """Publie métadonnées, interactions et index en mémoire partagée
+        
+        Appelé par le processus parent avant de lancer les workers : chacun s'y
+        attache ensuite sans copie via SHARED_DATA_MANIFEST. Les embeddings sont
+        déjà partagés par le cache de pages (mmap) et ne sont pas recopiés.
+        """
+        metadata = self.load_articles_metadata()
+        interactions, user_index = self._get_interactions_state()
+        store = self._article_store
+        
+        arrays = frame_arrays("articles_metadata", metadata)
+        arrays.update({f"article_store/{column}": dense for column, dense in store.columns.items()})
+        arrays["article_store.present"] = store.present
+        arrays.update(frame_arrays("interactions", interactions))
+        arrays["user_index.offsets"] = user_index.offsets
+        
+        return SharedDataPlane.publish(arrays, meta={
+            "ingested_files": sorted(self._ingested_files),
+            "interactions_filtered": self._interactions_filtered
+        })
+    
+    def _get_shared_data(self) -> Optional[SharedDataPlane]:
+        """Segment partagé auquel s'attacher, si le processus parent en a publié un"""
+        if not settings.SHARED_DATA_MANIFEST:
+            return None
+        if self._shared_data is None:
+            self.loads.ensure(
+                "shared_data",
+                self._attach_shared_data,
+                is_loaded=lambda: self._shared_data is not None
+            )
+        return self._shared_data
+    
+    def _attach_shared_data(self):
+        self._shared_data = SharedDataPlane.attach(json.loads(settings.SHARED_DATA_MANIFEST))
+        logger.info(f"🧩 Attaché à la mémoire partagée: {self._shared_data.manifest['segment']}")
+    
+    def _filter_recommendable_interactions(self, interactions: pd.DataFrame) -> pd.DataFrame:
+        """Conserve uniquement les interactions sur des articles recommandables"""
+        recommendable_ids = set(self.get_recommendable_articles()['article_id'].tolist())
+        before_filter = len(interactions)
+        interactions = interactions[interactions['click_article_id'].isin(recommendable_ids)]
+        after_filter = len(interactions)
+        logger.info(f"🔗 Interactions filtrées: {after_filter:,} (supprimées: {before_filter-after_filter:,})")
+        return interactions
+    
+    def _read_click_files(self, click_files: List[str]) -> Tuple[pd.DataFrame, List[str]]:
+        """Lit les fichiers de clics, via le snapshot binaire s'il est à jour"""
+        snapshot_path = settings.CACHE_PATH / clicks_store.SNAPSHOT_FILENAME
+        manifest = None
+        
+        if settings.CLICKS_SNAPSHOT_ENABLED:
+            manifest = clicks_store.build_manifest(click_files)
+            snapshot = clicks_store.load_snapshot(snapshot_path, manifest)
+            if snapshot is not None:
+                logger.info(f"⚡ Snapshot des clics chargé: {len(snapshot):,} lignes")
+                return snapshot, []
+        
+        all_interactions, failed_files = clicks_store.read_click_files(
+            click_files, workers=settings.CLICKS_INGEST_WORKERS
+        )
+        if len(all_interactions) == 0:
+            return all_interactions, failed_files
+        
+        # Snapshot écrit déjà trié : le tri n'est plus refait aux démarrages suivants
+        all_interactions = UserIndex.sort_interactions(all_interactions)
+        
+        # Pas de snapshot partiel : un fichier en erreur serait ignoré jusqu'à sa modification
+        if manifest is not None and not failed_files:
+            self._save_snapshot(all_interactions, click_files)
+        
+        return all_interactions, failed_files
+    
+    def _save_snapshot(self, interactions: pd.DataFrame, click_files: List[str]):
+        """Écrit le snapshot des clics pour les fichiers donnés"""
+        snapshot_path = settings.CACHE_PATH / clicks_store.SNAPSHOT_FILENAME
+        try:
+            clicks_store.save_snapshot(interactions, snapshot_path, clicks_store.build_manifest(click_files))
+        except Exception as e:
+            logger.error(f"❌ Erreur écriture snapshot {snapshot_path}: {e}")
+    
+    def ingest_new_click_files(self) -> Dict:
+        """Ajoute les fichiers horaires pas encore ingérés, sans relire les autres
+        
+        Les structures dérivées (index utilisateurs, date de référence, version des
+        données) sont mises à jour à partir des seules nouvelles lignes. Un fichier
+        déjà ingéré puis modifié n'est pas relu : utiliser load_user_interactions(reload=True).
+        """
+        self.load_user_interactions()
+        if self._shared_data is not None:
+            logger.warning("⚠️ Ingestion locale au worker : les autres workers gardent les données partagées")
+        # Exclusif avec un (re)chargement ou une autre ingestion
+        with self.loads.exclusive("user_interactions"):
+            return self._ingest_new_click_files()
+    
+    def _ingest_new_click_files(self) -> Dict:
         interactions = self.load_user_interactions()
-        user_data = interactions[interactions['user_id'] == user_id].copy()
-        user_data = user_data.sort_values('click_timestamp', ascending=False)
+        clicks_path = self.data_path / "clicks"
+        click_files = clicks_store.list_click_files(clicks_path)
+        new_files = [
+            file_path for file_path in click_files
+            if os.path.basename(file_path) not in self._ingested_files
+        ]
+        
+        if not new_files:
+            return {
+                "new_files": 0,
+                "new_interactions": 0,
+                "total_interactions": len(interactions),
+                "data_version": self._data_version
+            }
+        
+        new_interactions, failed_files = clicks_store.read_click_files(
+            new_files, workers=settings.CLICKS_INGEST_WORKERS
+        )
+        
+        if len(new_interactions) > 0:
+            if self._interactions_filtered:
+                new_interactions = self._filter_recommendable_interactions(new_interactions)
+            self._append_interactions(UserIndex.sort_interactions(new_interactions))
+        
+        self._ingested_files.update(
+            os.path.basename(file_path) for file_path in new_files if file_path not in failed_files
+        )
+        
+        # Le snapshot ne contient que des clics non filtrés
+        if settings.CLICKS_SNAPSHOT_ENABLED and not self._interactions_filtered:
+            ingested_files = [
+                file_path for file_path in click_files
+                if os.path.basename(file_path) in self._ingested_files
+            ]
+            self._save_snapshot(self.load_user_interactions(), ingested_files)
+        
+        logger.info(f"📥 {len(new_files) - len(failed_files)} nouveaux fichiers de clics ingérés "
+                    f"(+{len(new_interactions):,} interactions)")
+        
+        return {
+            "new_files": len(new_files) - len(failed_files),
+            "failed_files": [os.path.basename(file_path) for file_path in failed_files],
+            "new_interactions": len(new_interactions),
+            "total_interactions": len(self.load_user_interactions()),
+            "reference_date": self._get_reference_date().isoformat(),
+            "data_version": self._data_version
+        }
+    
+    def _append_interactions(self, new_interactions: pd.DataFrame):
+        """Fusionne des interactions triées et met à jour les structures dérivées"""
+        if len(new_interactions) == 0:
+            return
+        
+        interactions, user_index = self._interactions_state
+        if len(interactions) > 0:
+            interactions = UserIndex.merge_sorted(interactions, new_interactions, user_index.offsets)
+            user_index = user_index.extend(new_interactions['user_id'].to_numpy())
+        else:
+            interactions = new_interactions
+            user_index = UserIndex.build(interactions['user_id'].to_numpy())
+        self._interactions_state = (interactions, user_index)
+        self._data_version += 1
+        if settings.CLUSTER_MODE == "incremental":
+            self._updated_users.append(np.unique(new_interactions['user_id'].to_numpy()))
+        
+        self._advance_reference_date(int(new_interactions['click_timestamp'].max()))
+    
+    def _advance_reference_date(self, max_timestamp: int):
+        """Avance la date de référence auto-détectée si de nouveaux clics la dépassent"""
+        if settings.REFERENCE_DATE or self._reference_date is None:
+            return
+        
+        new_reference_date = datetime.fromtimestamp(max_timestamp / 1000)
+        if new_reference_date > self._reference_date:
+            self._reference_date = new_reference_date
+            # La fenêtre d'âge des articles recommandables glisse avec la date de référence
+            self._recommendable_articles = None
+            logger.info(f"🕐 Date de référence avancée: {self._reference_date.strftime('%Y-%m-%d %H:%M')}")
+    
+    def take_updated_users(self) -> np.ndarray:
+        """Utilisateurs ayant reçu de nouveaux clics depuis le dernier appel (ingestions)"""
+        updated, self._updated_users = self._updated_users, []
+        if not updated:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(updated))
+    
+    def requeue_updated_users(self, user_ids):
+        """Remet en attente des utilisateurs pris par take_updated_users mais non traités"""
+        if len(user_ids) > 0:
+            self._updated_users.append(np.asarray(user_ids, dtype=np.int64))
+    
+    def get_data_version(self) -> int:
+        """Version des interactions, incrémentée à chaque (re)chargement ou ingestion"""
+        self.load_user_interactions()
+        return self._data_version
+    
+    def get_user_history(self, user_id: int, limit: int = None) -> pd.DataFrame:
+        """Récupère l'historique d'un utilisateur (du plus récent au plus ancien)"""
+        interactions, user_index = self._get_interactions_state()
+        start, end = user_index.bounds(user_id)
         
         if limit:
-            user_data = user_data.head(limit)
+            end = min(end, start + limit)
             
-        return user_data
+        return interactions.iloc[start:end]
+    
+    def get_user_article_ids(self, user_id: int, limit: int = None) -> np.ndarray:
+        """Articles cliqués par un utilisateur (du plus récent au plus ancien)"""
+        interactions, user_index = self._get_interactions_state()
+        if len(interactions) == 0:
+            return np.zeros(0, dtype=np.int32)
+        
+        start, end = user_index.bounds(user_id)
+        if limit:
+            end = min(end, start + limit)
+        
+        return interactions['click_article_id'].to_numpy()[start:end]
+    
+    def get_users_article_ids(self, user_ids, limit: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Articles cliqués par plusieurs utilisateurs, en une passe vectorisée
+        
+        Returns:
+            (article_ids, offsets) : les articles de user_ids[i] sont
+            article_ids[offsets[i]:offsets[i + 1]], du plus récent au plus ancien
+        """
+        return self._get_users_column(user_ids, 'click_article_id', limit)
+    
+    def get_users_click_timestamps(self, user_ids, limit: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Timestamps des clics de plusieurs utilisateurs, alignés sur get_users_article_ids"""
+        return self._get_users_column(user_ids, 'click_timestamp', limit)
+    
+    def _get_users_column(self, user_ids, column: str, limit: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        interactions, user_index = self._get_interactions_state()
+        starts, ends = user_index.bounds_many(user_ids)
+        if limit:
+            ends = np.minimum(ends, starts + limit)
+        
+        offsets = np.zeros(len(starts) + 1, dtype=np.int64)
+        np.cumsum(ends - starts, out=offsets[1:])
+        if offsets[-1] == 0:
+            return np.zeros(0, dtype=clicks_store.CLICKS_SCHEMA[column]), offsets
+        
+        # Indices des lignes de chaque tranche, concaténés sans boucle Python
+        rows = np.repeat(starts - offsets[:-1], ends - starts) + np.arange(offsets[-1])
+        return interactions[column].to_numpy()[rows], offsets
+    
+    def get_user_interaction_count(self, user_id: int) -> int:
+        """Nombre d'interactions d'un utilisateur"""
+        return self._get_interactions_state()[1].count(user_id)
+    
+    def get_user_version(self, user_id: int) -> Tuple[int, int]:
+        """(nombre de clics, timestamp du dernier clic) : change dès que l'utilisateur clique"""
+        interactions, user_index = self._get_interactions_state()
+        start, end = user_index.bounds(user_id)
+        if start == end:
+            return 0, 0
+        return end - start, int(interactions['click_timestamp'].to_numpy()[start])
     
     def get_recent_popular_articles(self, days: int = None) -> pd.DataFrame:
-        """Récupère les articles populaires dans la fenêtre temporelle"""
+        """Récupère les articles populaires dans la fenêtre temporelle
+        
+        Le classement est matérialisé par taille de fenêtre et réutilisé tant que
+        la version des interactions (et donc la date de référence) ne change pas.
+        Le DataFrame retourné est partagé : ne pas le modifier.
+        """
         if days is None:
             days = settings.POPULARITY_WINDOW_DAYS
             
         interactions = self.load_user_interactions()
         reference_date = self._get_reference_date()
+        
+        cached = self._popularity_leaderboards.get(days)
+        if cached is not None and cached[0] == (self._data_version, reference_date):
+            self._popularity_cache_hits += 1
+            return cached[1]
+        
+        self._popularity_cache_misses += 1
+        result = self._compute_popularity(interactions, reference_date, days)
+        self._popularity_leaderboards[days] = ((self._data_version, reference_date), result)
+        return result
+    
+    def _compute_popularity(self, interactions: pd.DataFrame, reference_date: datetime, days: int) -> pd.DataFrame:
+        """Calcule le classement de popularité sur la fenêtre [référence - days, référence]"""
         cutoff_date = reference_date - timedelta(days=days)
         cutoff_timestamp = int(cutoff_date.timestamp() * 1000)
         
@@ -173,30 +515,58 @@ class DataLoader:
         
         return result
     
+    def get_cache_stats(self) -> Dict:
+        """Compteurs des caches matérialisés"""
+        return {
+            "data_version": self._data_version,
+            "popularity_leaderboard": {
+                "hits": self._popularity_cache_hits,
+                "misses": self._popularity_cache_misses,
+                "windows_days": sorted(self._popularity_leaderboards.keys())
+            }
+        }
+    
     def get_all_users(self) -> List[int]:
         """Récupère la liste de tous les utilisateurs"""
-        interactions = self.load_user_interactions()
-        return sorted(interactions['user_id'].unique().tolist())
+        return self._get_interactions_state()[1].user_ids().tolist()
+    
+    def has_user(self, user_id: int) -> bool:
+        """Vérifie en O(1) qu'un utilisateur existe"""
+        return self._get_interactions_state()[1].contains(user_id)
+    
+    def list_users(self, cursor: Optional[int] = None, limit: int = 100) -> Tuple[List[int], Optional[int]]:
+        """Page d'utilisateurs triés après `cursor`, et curseur de la page suivante"""
+        users, next_cursor = self._get_interactions_state()[1].page(cursor, limit)
+        return users.tolist(), next_cursor
+    
+    def get_article_store(self) -> ArticleStore:
+        """Store dense des métadonnées, indexé par article_id"""
+        self.load_articles_metadata()
+        return self._article_store
     
     def get_article_info(self, article_id: int) -> Dict:
         """Récupère les informations d'un article"""
-        metadata = self.load_articles_metadata()
-        article = metadata[metadata['article_id'] == article_id]
+        article_dict = self.get_article_store().get(article_id)
         
-        if len(article) == 0:
+        if article_dict is None:
             return {"error": "Article not found"}
         
-        article_dict = article.iloc[0].to_dict()
-        
-        # Conversion des types numpy pour la sérialisation JSON
-        for key, value in article_dict.items():
-            if hasattr(value, 'item'):  # numpy types
-                article_dict[key] = value.item()
-            elif pd.isna(value):
-                article_dict[key] = None
-                
         return article_dict
     
+    def get_articles_info(self, article_ids) -> List[Dict]:
+        """Récupère les informations de plusieurs articles en une seule passe"""
+        return [
+            article_dict if article_dict is not None else {"error": "Article not found"}
+            for article_dict in self.get_article_store().get_many(article_ids)
+        ]
+    
+    def get_article_categories(self, article_ids) -> np.ndarray:
+        """Catégories des articles connus parmi article_ids (ordre conservé)"""
+        store = self.get_article_store()
+        article_ids = np.asarray(article_ids, dtype=np.int64)
+        known = article_ids[store.contains_many(article_ids)]
+        return store.columns['category_id'][known]
+    
     def get_user_stats(self, user_id: int) -> Dict:
         """Statistiques d'un utilisateur"""
         history = self.get_user_history(user_id)
@@ -207,13 +577,9 @@ class DataLoader:
         # Catégories les plus consultées
         categories = []
         if len(history) > 0:
-            metadata = self.load_articles_metadata()
-            merged = history.merge(metadata[['article_id', 'category_id']], 
-                                 left_on='click_article_id', 
-                                 right_on='article_id', 
-                                 how='left')
-            if len(merged) > 0:
-                cat_counts = merged['category_id'].value_counts().head(5)
+            history_categories = self.get_article_categories(history['click_article_id'].to_numpy())
+            if len(history_categories) > 0:
+                cat_counts = pd.Series(history_categories).value_counts().head(5)
                 categories = [{"category_id": int(cat), "count": int(count)} 
                             for cat, count in cat_counts.items()]
         
@@ -222,12 +588,27 @@ class DataLoader:
             "total_interactions": len(history),
             "unique_articles": history['click_article_id'].nunique(),
             "date_range": {
-                "first_interaction": history['click_datetime'].min().isoformat() if len(history) > 0 else None,
-                "last_interaction": history['click_datetime'].max().isoformat() if len(history) > 0 else None
+                "first_interaction": pd.to_datetime(history['click_timestamp'].min(), unit='ms').isoformat() if len(history) > 0 else None,
+                "last_interaction": pd.to_datetime(history['click_timestamp'].max(), unit='ms').isoformat() if len(history) > 0 else None
             },
             "top_categories": categories
         }
     
+    def get_interactions_memory_stats(self) -> Dict:
+        """Mémoire du DataFrame d'interactions, comparée au schéma int64 d'origine"""
+        interactions = self.load_user_interactions()
+        current_bytes = int(interactions.memory_usage(index=False, deep=True).sum())
+        
+        # Schéma d'origine : toutes les colonnes en int64 + click_datetime en doublon
+        int64_bytes = len(interactions) * 8 * (len(clicks_store.CLICKS_SCHEMA) + 1)
+        
+        return {
+            "dtypes": {column: str(dtype) for column, dtype in interactions.dtypes.items()},
+            "memory_mb": round(current_bytes / 1024 ** 2, 1),
+            "int64_schema_memory_mb": round(int64_bytes / 1024 ** 2, 1),
+            "memory_saved_mb": round((int64_bytes - current_bytes) / 1024 ** 2, 1)
+        }
+    
     def get_data_stats(self) -> Dict:
         """Statistiques générales des données"""
         try:
@@ -240,7 +621,7 @@ class DataLoader:
                 "total_articles": len(metadata),
                 "recommendable_articles": len(recommendable),
                 "total_interactions": len(interactions),
-                "unique_users": interactions['user_id'].nunique() if len(interactions) > 0 else 0,
+                "unique_users": len(self._get_interactions_state()[1].user_ids()),
                 "reference_date": reference_date.isoformat(),
                 "data_loaded": True
             }
@@ -0,0 +1,54 @@
+# backend/embeddings_store.py
+import os
+import pickle
+from pathlib import Path
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_NPY_FILENAME = "articles_embeddings.npy"
+
+
+def convert_pickle_to_npy(pickle_path: Path, npy_path: Path) -> None:
+    """Convertit la matrice d'embeddings picklée en fichier .npy brut (mappable en mémoire)"""
+    with open(pickle_path, 'rb') as f:
+        embeddings = np.ascontiguousarray(pickle.load(f))
+
+    npy_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Écriture atomique : un worker ne mappe jamais un fichier partiel
+    tmp_path = npy_path.with_name(f"{npy_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        np.save(f, embeddings)
+    os.replace(tmp_path, npy_path)
+
+    logger.info(f"💾 Embeddings convertis: {pickle_path} → {npy_path} {embeddings.shape}")
+
+
+def _is_stale(npy_path: Path, pickle_path: Path) -> bool:
+    """Le fichier .npy est absent ou plus ancien que le pickle source"""
+    if not npy_path.exists():
+        return True
+    if not pickle_path.exists():
+        return False
+    return npy_path.stat().st_mtime < pickle_path.stat().st_mtime
+
+
+def load_embeddings(pickle_path: Path, npy_path: Path, mmap: bool = True) -> np.ndarray:
+    """Charge les embeddings, mappés en mémoire depuis le .npy (converti au besoin)
+
+    En mode mmap, la matrice est partagée via le cache de pages entre tous les
+    processus qui ouvrent le même fichier, et le chargement est quasi instantané.
+    """
+    if not mmap:
+        with open(pickle_path, 'rb') as f:
+            return pickle.load(f)
+
+    if _is_stale(npy_path, pickle_path):
+        logger.info(f"🔄 Conversion des embeddings en {npy_path}")
+        convert_pickle_to_npy(pickle_path, npy_path)
+
+    # Vue ndarray sur le mapping : indexer un np.memmap recrée un memmap à chaque accès
+    return np.asarray(np.load(npy_path, mmap_mode='r'))
@@ -0,0 +1,229 @@
+# backend/indexes.py
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+class UserIndex:
+    """Index CSR des interactions par utilisateur
+
+    Les interactions sont triées par (user_id, click_timestamp décroissant) :
+    les lignes de l'utilisateur u sont interactions.iloc[offsets[u]:offsets[u + 1]],
+    de la plus récente à la plus ancienne.
+    """
+
+    def __init__(self, offsets: np.ndarray):
+        self.offsets = offsets
+        self._user_ids = None
+
+    @staticmethod
+    def sort_interactions(interactions: pd.DataFrame) -> pd.DataFrame:
+        """Trie les interactions par (user_id, click_timestamp décroissant)"""
+        if len(interactions) == 0:
+            return interactions
+
+        user_ids = interactions['user_id'].to_numpy()
+        timestamps = interactions['click_timestamp'].to_numpy()
+
+        # Déjà trié (snapshot, filtrage par masque) : vérification O(n) sans copie
+        user_steps = np.diff(user_ids)
+        if np.all((user_steps > 0) | ((user_steps == 0) & (np.diff(timestamps) <= 0))):
+            return interactions
+
+        order = np.lexsort((-timestamps, user_ids))
+        return interactions.take(order).reset_index(drop=True)
+
+    @staticmethod
+    def merge_sorted(interactions: pd.DataFrame, new_interactions: pd.DataFrame,
+                     offsets: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Fusionne des nouvelles interactions triées dans un bloc déjà trié
+
+        Les nouveaux clics, plus récents, vont en tête de chaque utilisateur : leur
+        position d'insertion est lue dans les offsets (ou par recherche binaire), puis
+        chaque colonne est recopiée une fois dans le bloc fusionné, sans tri. Si un
+        fichier tardif contient des clics plus anciens que l'historique d'un
+        utilisateur, on retrie tout.
+        """
+        if len(interactions) == 0:
+            return UserIndex.sort_interactions(new_interactions)
+        if len(new_interactions) == 0:
+            return interactions
+
+        new_interactions = UserIndex.sort_interactions(new_interactions)
+        user_ids = interactions['user_id'].to_numpy()
+        new_user_ids = new_interactions['user_id'].to_numpy().astype(np.int64)
+
+        # Première ligne existante de chaque utilisateur (fin du bloc si nouvel utilisateur)
+        if offsets is not None:
+            positions = offsets[np.minimum(new_user_ids, len(offsets) - 1)]
+        else:
+            positions = np.searchsorted(user_ids, new_user_ids, side='left')
+
+        # Clic le plus ancien du lot de chaque utilisateur vs son clic existant le plus récent
+        last = np.ones(len(new_user_ids), dtype=bool)
+        np.not_equal(new_user_ids[1:], new_user_ids[:-1], out=last[:-1])
+        heads = positions[last]
+        has_history = np.zeros(len(heads), dtype=bool)
+        in_range = heads < len(interactions)
+        has_history[in_range] = user_ids[heads[in_range]] == new_user_ids[last][in_range]
+        late = (new_interactions['click_timestamp'].to_numpy()[last][has_history]
+                < interactions['click_timestamp'].to_numpy()[heads[has_history]])
+        if late.any():
+            combined = pd.concat([new_interactions, interactions], ignore_index=True)
+            return UserIndex.sort_interactions(combined)
+
+        # Fusion : la i-ème nouvelle ligne est décalée des i nouvelles lignes qui la précèdent
+        total = len(interactions) + len(new_interactions)
+        targets = positions + np.arange(len(new_interactions))
+        existing = np.ones(total, dtype=bool)
+        existing[targets] = False
+
+        merged = {}
+        for column in interactions.columns:
+            values = interactions[column].to_numpy()
+            new_values = new_interactions[column].to_numpy()
+            out = np.empty(total, dtype=np.result_type(values, new_values))
+            out[existing] = values
+            out[targets] = new_values
+            merged[column] = out
+        return pd.DataFrame(merged)
+
+    @classmethod
+    def build(cls, sorted_user_ids: np.ndarray) -> 'UserIndex':
+        """Construit les offsets à partir des user_id triés"""
+        counts = np.bincount(sorted_user_ids) if len(sorted_user_ids) > 0 else np.zeros(0, dtype=np.int64)
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(offsets)
+
+    def extend(self, new_user_ids: np.ndarray) -> 'UserIndex':
+        """Nouvel index après ajout d'interactions (O(nombre d'utilisateurs))"""
+        counts = np.diff(self.offsets)
+        new_counts = np.bincount(new_user_ids) if len(new_user_ids) > 0 else np.zeros(0, dtype=np.int64)
+
+        total = np.zeros(max(len(counts), len(new_counts)), dtype=np.int64)
+        total[:len(counts)] += counts
+        total[:len(new_counts)] += new_counts
+
+        offsets = np.zeros(len(total) + 1, dtype=np.int64)
+        np.cumsum(total, out=offsets[1:])
+        return UserIndex(offsets)
+
+    def bounds(self, user_id: int) -> Tuple[int, int]:
+        """Intervalle [début, fin) des lignes d'un utilisateur"""
+        if user_id < 0 or user_id >= len(self.offsets) - 1:
+            return 0, 0
+        return int(self.offsets[user_id]), int(self.offsets[user_id + 1])
+
+    def bounds_many(self, user_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Intervalles [début, fin) de plusieurs utilisateurs (vide si inconnu)"""
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        known = (user_ids >= 0) & (user_ids < len(self.offsets) - 1)
+        starts = np.zeros(len(user_ids), dtype=np.int64)
+        ends = np.zeros(len(user_ids), dtype=np.int64)
+        starts[known] = self.offsets[user_ids[known]]
+        ends[known] = self.offsets[user_ids[known] + 1]
+        return starts, ends
+    
+    def count(self, user_id: int) -> int:
+        """Nombre d'interactions d'un utilisateur"""
+        start, end = self.bounds(user_id)
+        return end - start
+
+    def contains(self, user_id: int) -> bool:
+        """Vérifie en O(1) qu'un utilisateur a au moins une interaction"""
+        return self.count(user_id) > 0
+
+    def user_ids(self) -> np.ndarray:
+        """Identifiants des utilisateurs présents, triés (calculés une fois par index)"""
+        if self._user_ids is None:
+            self._user_ids = np.flatnonzero(np.diff(self.offsets))
+        return self._user_ids
+
+    def page(self, cursor: Optional[int], limit: int) -> Tuple[np.ndarray, Optional[int]]:
+        """Page d'utilisateurs strictement après `cursor`, et curseur de la page suivante"""
+        user_ids = self.user_ids()
+        start = int(np.searchsorted(user_ids, cursor, side='right')) if cursor is not None else 0
+        users = user_ids[start:start + limit]
+
+        has_more = start + limit < len(user_ids)
+        next_cursor = int(users[-1]) if has_more and len(users) > 0 else None
+        return users, next_cursor
+
+
+class ArticleStore:
+    """Métadonnées des articles en colonnes denses indexées directement par article_id
+
+    Les article_id étant séquentiels (0 à 364 046), chaque colonne est un tableau
+    NumPy où la ligne i correspond à l'article i ; `present` marque les articles
+    conservés après filtrage.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], present: np.ndarray):
+        self.columns = columns
+        self.present = present
+
+    @classmethod
+    def from_metadata(cls, metadata: pd.DataFrame) -> 'ArticleStore':
+        """Construit le store à partir du DataFrame de métadonnées"""
+        article_ids = metadata['article_id'].to_numpy()
+        size = int(article_ids.max()) + 1 if len(article_ids) > 0 else 0
+
+        present = np.zeros(size, dtype=bool)
+        present[article_ids] = True
+
+        columns = {}
+        for column in metadata.columns:
+            values = metadata[column].to_numpy()
+            # Précision microseconde : tolist() renvoie alors des datetime Python
+            if np.issubdtype(values.dtype, np.datetime64):
+                values = values.astype('datetime64[us]')
+            dense = np.zeros(size, dtype=values.dtype)
+            dense[article_ids] = values
+            columns[column] = dense
+
+        return cls(columns, present)
+
+    def contains(self, article_id: int) -> bool:
+        """Vérifie qu'un article est présent"""
+        return 0 <= article_id < len(self.present) and bool(self.present[article_id])
+
+    def contains_many(self, article_ids: np.ndarray) -> np.ndarray:
+        """Masque de présence pour un tableau d'article_id"""
+        article_ids = np.asarray(article_ids, dtype=np.int64)
+        in_range = (article_ids >= 0) & (article_ids < len(self.present))
+        mask = np.zeros(len(article_ids), dtype=bool)
+        mask[in_range] = self.present[article_ids[in_range]]
+        return mask
+
+    def get(self, article_id: int) -> Optional[Dict]:
+        """Métadonnées d'un article sous forme de dict JSON-sérialisable"""
+        if not self.contains(article_id):
+            return None
+
+        record = {}
+        for column, dense in self.columns.items():
+            value = dense[article_id].item()
+            record[column] = None if value != value else value  # NaN → None
+        return record
+
+    def get_many(self, article_ids) -> List[Optional[Dict]]:
+        """Métadonnées de plusieurs articles en une passe (None si absent)"""
+        article_ids = np.asarray(article_ids, dtype=np.int64)
+        mask = self.contains_many(article_ids)
+        found = article_ids[mask]
+
+        # Une indexation vectorisée + tolist() par colonne, puis assemblage des dicts
+        values = {}
+        for column, dense in self.columns.items():
+            column_values = dense[found].tolist()
+            if np.issubdtype(dense.dtype, np.floating):
+                column_values = [None if value != value else value for value in column_values]
+            values[column] = column_values
+
+        records = [dict(zip(values.keys(), row)) for row in zip(*values.values())]
+
+        results: List[Optional[Dict]] = [None] * len(article_ids)
+        for position, record in zip(np.flatnonzero(mask), records):
+            results[position] = record
+        return results
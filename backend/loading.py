@@ -0,0 +1,95 @@
+# backend/loading.py
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+
+class _ResourceState:
+    """État observable d'une ressource chargée paresseusement"""
+
+    def __init__(self):
+        # Réentrant : un chargeur peut dépendre d'une autre ressource qui le rappelle
+        self.lock = threading.RLock()
+        self.state = "idle"
+        self.waiting = 0
+        self.loads = 0
+        self.duration_s: Optional[float] = None
+        self.started_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+
+class LoadTracker:
+    """Chargements paresseux en vol unique (single-flight)
+
+    Un seul appelant exécute le chargeur d'une ressource ; les appelants
+    concurrents attendent sa fin puis réutilisent le résultat au lieu de
+    relancer le chargement.
+    """
+
+    def __init__(self):
+        self._registry_lock = threading.Lock()
+        self._resources: Dict[str, _ResourceState] = {}
+
+    def _resource(self, name: str) -> _ResourceState:
+        with self._registry_lock:
+            if name not in self._resources:
+                self._resources[name] = _ResourceState()
+            return self._resources[name]
+
+    def ensure(self, name: str, loader: Callable[[], Any], is_loaded: Callable[[], bool]) -> None:
+        """Exécute `loader` une seule fois tant que `is_loaded()` est faux"""
+        if is_loaded():
+            return
+
+        with self.exclusive(name) as resource:
+            # Un autre appelant a pu terminer le chargement pendant l'attente
+            if is_loaded():
+                return
+
+            resource.state = "loading"
+            resource.started_at = datetime.now()
+            start = time.perf_counter()
+            try:
+                loader()
+                resource.state = "ready"
+                resource.last_error = None
+            except Exception as e:
+                resource.state = "failed"
+                resource.last_error = str(e)
+                raise
+            finally:
+                resource.loads += 1
+                resource.duration_s = round(time.perf_counter() - start, 3)
+
+    @contextmanager
+    def exclusive(self, name: str):
+        """Section exclusive sur une ressource (ex: ingestion incrémentale)"""
+        resource = self._resource(name)
+        with self._registry_lock:
+            resource.waiting += 1
+        try:
+            resource.lock.acquire()
+        finally:
+            with self._registry_lock:
+                resource.waiting -= 1
+        try:
+            yield resource
+        finally:
+            resource.lock.release()
+
+    def stats(self) -> Dict[str, Dict]:
+        """État, durée du dernier chargement et appelants en attente par ressource"""
+        with self._registry_lock:
+            return {
+                name: {
+                    "state": resource.state,
+                    "duration_s": resource.duration_s,
+                    "waiting_callers": resource.waiting,
+                    "loads": resource.loads,
+                    "started_at": resource.started_at.isoformat() if resource.started_at else None,
+                    "last_error": resource.last_error
+                }
+                for name, resource in sorted(self._resources.items())
+            }
@@ -1,10 +1,12 @@
 # backend/main.py
+import json
 import logging
+import os
 from datetime import datetime
 from typing import List, Optional
 import uvicorn
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from models import (
@@ -21,6 +23,7 @@ from recommenders import (
     HybridRecommender
 )
 from config import settings
+from warmup import Warmup
 
 # Configuration du logging
 logging.basicConfig(
@@ -49,23 +52,78 @@ app.add_middleware(
 recommenders = {}
 
 def get_recommender(method: str):
-    """Factory pour créer les recommandeurs"""
+    """Factory pour créer les recommandeurs (une seule création par méthode)"""
     if method not in recommenders:
-        if method == "popularity":
-            recommenders[method] = PopularityRecommender(data_loader)
-        elif method == "content":
-            recommenders[method] = ContentRecommender(data_loader)
-        elif method == "clustering":
-            recommenders[method] = ClusteringRecommender(data_loader)
-        elif method == "hybrid":
-            recommenders[method] = HybridRecommender(data_loader)
-        else:
+        if method not in ("popularity", "content", "clustering", "hybrid"):
             raise ValueError(f"Méthode de recommandation inconnue: {method}")
         
-        logger.info(f"📦 Recommandeur {method} initialisé")
+        data_loader.loads.ensure(
+            f"recommender:{method}",
+            lambda: _create_recommender(method),
+            is_loaded=lambda: method in recommenders
+        )
     
     return recommenders[method]
 
+def _create_recommender(method: str):
+    if method == "popularity":
+        recommenders[method] = PopularityRecommender(data_loader)
+    elif method == "content":
+        recommenders[method] = ContentRecommender(data_loader)
+    elif method == "clustering":
+        recommenders[method] = ClusteringRecommender(data_loader)
+    elif method == "hybrid":
+        # Le hybride réutilise les instances partagées (un seul entraînement des clusters)
+        recommenders[method] = HybridRecommender(
+            data_loader,
+            popularity_rec=get_recommender("popularity"),
+            content_rec=get_recommender("content"),
+            clustering_rec=get_recommender("clustering")
+        )
+    
+    logger.info(f"📦 Recommandeur {method} initialisé")
+
+# =======================
+# PRÉCHAUFFAGE
+# =======================
+
+warmup = Warmup(
+    enabled=settings.WARMUP_ENABLED,
+    retry_delay_s=settings.WARMUP_RETRY_DELAY_SECONDS,
+    max_retry_delay_s=settings.WARMUP_RETRY_MAX_DELAY_SECONDS
+)
+warmup.add_phase("articles_metadata", data_loader.load_articles_metadata)
+warmup.add_phase("user_interactions", data_loader.load_user_interactions)
+warmup.add_phase("articles_embeddings", data_loader.load_articles_embeddings)
+warmup.add_phase("recommendable_articles", data_loader.get_recommendable_articles)
+warmup.add_phase("popularity_leaderboard", data_loader.get_recent_popular_articles)
+for _method in ("popularity", "content", "clustering", "hybrid"):
+    warmup.add_phase(f"recommender:{_method}", lambda method=_method: get_recommender(method))
+warmup.add_phase("content_candidates", lambda: get_recommender("content").get_candidates())
+if settings.CONTENT_RETRIEVAL == "ivf":
+    warmup.add_phase("content_ivf_index", lambda: get_recommender("content").get_ann_index())
+if settings.CONTENT_RETRIEVAL == "neighbors":
+    warmup.add_phase("item_neighbors", lambda: get_recommender("content").get_item_neighbors())
+if settings.PROFILE_MATRIX_ENABLED:
+    warmup.add_phase("user_profiles", lambda: get_recommender("content").get_profile_matrix())
+warmup.add_phase("clusters", lambda: get_recommender("clustering").ensure_trained())
+warmup.add_phase("cluster_rankings", lambda: get_recommender("clustering").get_cluster_rankings())
+
+@app.on_event("startup")
+async def start_warmup():
+    """Préchauffe l'instance avant de recevoir le trafic"""
+    if not settings.WARMUP_ENABLED:
+        return
+    if settings.WARMUP_BLOCKING:
+        warmup.run()
+    else:
+        warmup.start_background()
+
+@app.on_event("startup")
+async def start_cluster_scheduler():
+    """Réentraîne périodiquement les clusters en arrière-plan, sans bloquer les requêtes"""
+    get_recommender("clustering").start_scheduler(settings.CLUSTER_SCHEDULER_INTERVAL_MINUTES)
+
 # =======================
 # ENDPOINTS PRINCIPAUX
 # =======================
@@ -96,6 +154,13 @@ async def health_check():
         logger.error(f"❌ Health check failed: {e}")
         raise HTTPException(status_code=500, detail=f"Health check failed: {str(e)}")
 
+@app.get("/ready", response_model=dict)
+async def readiness_check(response: Response):
+    """Prêt à recevoir du trafic : 503 tant que le préchauffage n'est pas terminé"""
+    if not warmup.is_ready():
+        response.status_code = 503
+    return warmup.report()
+
 @app.post("/recommend/{user_id}", response_model=RecommendationResponse)
 async def recommend_for_user(
     user_id: int,
@@ -126,8 +191,7 @@ async def recommend_for_user(
     
     try:
         # Vérifier que l'utilisateur existe
-        all_users = data_loader.get_all_users()
-        if user_id not in all_users:
+        if not data_loader.has_user(user_id):
             raise HTTPException(
                 status_code=404, 
                 detail=f"Utilisateur {user_id} non trouvé"
@@ -170,19 +234,23 @@ async def recommend_for_user(
         raise HTTPException(status_code=500, detail=f"Erreur interne: {str(e)}")
 
 @app.get("/users", response_model=List[int])
-async def get_users(limit: int = 100):
+async def get_users(response: Response, limit: int = 100, cursor: Optional[int] = None):
     """
-    Liste des utilisateurs disponibles (pour tests)
+    Liste des utilisateurs disponibles, triés par identifiant
     
-    - **limit**: Nombre maximum d'utilisateurs à retourner
+    - **limit**: Nombre maximum d'utilisateurs à retourner (max 1000)
+    - **cursor**: Dernier user_id de la page précédente ; le curseur de la page
+      suivante est renvoyé dans l'en-tête `X-Next-Cursor`
     """
     try:
-        all_users = data_loader.get_all_users()
-        
         if limit > 1000:
             limit = 1000
+        
+        users, next_cursor = data_loader.list_users(cursor=cursor, limit=limit)
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = str(next_cursor)
             
-        return all_users[:limit]
+        return users
         
     except Exception as e:
         logger.error(f"❌ Erreur récupération utilisateurs: {e}")
@@ -218,8 +286,7 @@ async def get_user_segment(user_id: int):
     """
     try:
         # Vérifier que l'utilisateur existe
-        all_users = data_loader.get_all_users()
-        if user_id not in all_users:
+        if not data_loader.has_user(user_id):
             raise HTTPException(
                 status_code=404, 
                 detail=f"Utilisateur {user_id} non trouvé"
@@ -270,9 +337,11 @@ async def get_popular_articles(limit: int = 10):
 
         popular = data_loader.get_recent_popular_articles()
 
+        top_popular = popular.head(limit)
+        articles_info = data_loader.get_articles_info(top_popular.index.to_numpy())
+
         results = []
-        for i, (article_id, row) in enumerate(popular.head(limit).iterrows()):
-            article_info = data_loader.get_article_info(article_id)
+        for i, ((article_id, row), article_info) in enumerate(zip(top_popular.iterrows(), articles_info)):
             results.append({
                 "rank": i + 1,
                 "article_id": article_id,
@@ -303,24 +372,24 @@ async def get_clusters_characteristics():
         clustering_rec = get_recommender("clustering")
 
         # Déclencher le calcul des clusters si nécessaire
-        if clustering_rec._cluster_characteristics is None:
-            clustering_rec._get_user_cluster(1)  # Force le calcul avec un user dummy
+        clustering_rec.ensure_trained()
+        state = clustering_rec.get_state()
 
-        if clustering_rec._cluster_characteristics is None:
+        if state is None or state.cluster_characteristics is None:
             raise HTTPException(
                 status_code=503,
                 detail="Clusters non disponibles - pas assez de données"
             )
 
         clusters_info = {
-            "total_clusters": len(clustering_rec._cluster_characteristics),
-            "last_training": clustering_rec._last_training.isoformat() if clustering_rec._last_training else None,
+            "total_clusters": len(state.cluster_characteristics),
+            "last_training": state.last_training.isoformat() if state.last_training else None,
             "clusters": {}
         }
 
-        total_users = sum(char['size'] for char in clustering_rec._cluster_characteristics.values())
+        total_users = sum(char['size'] for char in state.cluster_characteristics.values())
 
-        for cluster_id, characteristics in clustering_rec._cluster_characteristics.items():
+        for cluster_id, characteristics in state.cluster_characteristics.items():
             clusters_info["clusters"][str(cluster_id)] = {
                 "cluster_id": cluster_id,
                 "size": characteristics['size'],
@@ -336,9 +405,9 @@ async def get_clusters_characteristics():
 
         clusters_info["summary"] = {
             "total_users_clustered": total_users,
-            "most_active_cluster": max(clustering_rec._cluster_characteristics.items(),
+            "most_active_cluster": max(state.cluster_characteristics.items(),
                                      key=lambda x: x[1]['activity_level'])[0],
-            "largest_cluster": max(clustering_rec._cluster_characteristics.items(),
+            "largest_cluster": max(state.cluster_characteristics.items(),
                                  key=lambda x: x[1]['size'])[0]
         }
 
@@ -407,6 +476,7 @@ async def get_detailed_data_stats():
             "categories_count": metadata['category_id'].nunique(),
             "avg_words_per_article": metadata['words_count'].mean(),
             "interactions_per_user": interactions.groupby('user_id')['click_article_id'].count().mean() if len(interactions) > 0 else 0,
+            "interactions_memory": data_loader.get_interactions_memory_stats(),
             "date_range": {
                 "min_article_date": metadata['created_date'].min().isoformat(),
                 "max_article_date": metadata['created_date'].max().isoformat(),
@@ -420,6 +490,41 @@ async def get_detailed_data_stats():
         logger.error(f"❌ Erreur stats détaillées: {e}")
         raise HTTPException(status_code=500, detail=f"Erreur interne: {str(e)}")
 
+@app.get("/debug/loading", response_model=dict)
+async def get_loading_stats():
+    """État des chargements paresseux : état, durée, appelants en attente (debug)"""
+    return data_loader.loads.stats()
+
+@app.get("/debug/cache-stats", response_model=dict)
+async def get_cache_stats():
+    """Compteurs de succès/échecs des caches (debug)"""
+    stats = data_loader.get_cache_stats()
+    if "content" in recommenders:
+        stats["user_profiles"] = recommenders["content"].get_profile_cache_stats()
+    return stats
+
+@app.post("/debug/ingest-clicks", response_model=dict)
+def ingest_new_clicks():
+    """Ingère les nouveaux fichiers horaires de clics sans rechargement complet
+    
+    En CLUSTER_MODE=incremental, les clusters des utilisateurs touchés sont mis à jour
+    (réentraînement complet en arrière-plan sur dérive). Dans tous les modes, les
+    classements par cluster sont recalculés sur les nouveaux clics. Endpoint
+    synchrone : exécuté dans le pool de threads, sans bloquer la boucle d'événements.
+    """
+    try:
+        result = data_loader.ingest_new_click_files()
+        if result["new_interactions"] > 0:
+            clustering_rec = get_recommender("clustering")
+            if settings.CLUSTER_MODE == "incremental":
+                result["clusters"] = clustering_rec.update_clusters(data_loader.take_updated_users())
+            # Sans effet si la mise à jour incrémentale vient de les recalculer
+            clustering_rec.refresh_rankings()
+        return result
+    except Exception as e:
+        logger.error(f"❌ Erreur ingestion des clics: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur interne: {str(e)}")
+
 # =======================
 # GESTION DES ERREURS
 # =======================
@@ -447,10 +552,27 @@ if __name__ == "__main__":
     except Exception as e:
         logger.error(f"⚠️ Erreur préchargement: {e}")
     
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+    # Plusieurs workers : les données sont publiées une fois en mémoire partagée,
+    # chaque worker s'y attache au lieu de les recharger
+    shared_data = None
+    if settings.API_WORKERS > 1:
+        try:
+            shared_data = data_loader.publish_shared_data()
+            os.environ["SHARED_DATA_MANIFEST"] = json.dumps(shared_data.manifest)
+        except Exception as e:
+            logger.error(f"⚠️ Erreur publication mémoire partagée: {e}")
+    
+    try:
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            # Le rechargement automatique est incompatible avec plusieurs workers
+            reload=settings.API_WORKERS <= 1,
+            workers=settings.API_WORKERS,
+            log_level="info"
+        )
+    finally:
+        if shared_data is not None:
+            shared_data.close()
+            shared_data.unlink()
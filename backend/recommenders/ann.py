@@ -0,0 +1,146 @@
+# backend/recommenders/ann.py
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+IVF_INDEX_FILENAME = "content_ivf_index.npz"
+
+# Taille des blocs de lignes pour les produits matriciels (mémoire bornée)
+_BLOCK_ROWS = 16384
+
+
+def fingerprint_rows(n_rows: int) -> np.ndarray:
+    """Lignes échantillonnées pour l'empreinte (environ 1 024)"""
+    return np.arange(0, n_rows, max(1, n_rows // 1024))
+
+
+def fingerprint(article_ids: np.ndarray, dim: int, sample: np.ndarray) -> str:
+    """Empreinte des candidats indexés : ids, dimension et vecteurs des lignes
+    `fingerprint_rows(len(article_ids))`"""
+    digest = hashlib.sha1()
+    digest.update(np.ascontiguousarray(article_ids, dtype=np.int64).tobytes())
+    digest.update(str((len(article_ids), dim)).encode())
+    digest.update(np.ascontiguousarray(sample).tobytes())
+    return digest.hexdigest()
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Centroïde le plus proche (produit scalaire maximal) de chaque vecteur"""
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _BLOCK_ROWS):
+        block = vectors[start:start + _BLOCK_ROWS]
+        assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=vectors, where=norms > 0)
+
+
+class IVFIndex:
+    """Index IVF (inverted file) sur des vecteurs L2-normalisés
+
+    Les vecteurs sont répartis en `nlist` listes par k-means sphérique ; une
+    requête ne parcourt que les `nprobe` listes dont le centroïde est le plus
+    proche. nprobe règle le compromis rappel/latence (nprobe = nlist : scan exact).
+    Les positions renvoyées sont les lignes de la matrice indexée.
+    """
+
+    def __init__(self, centroids: np.ndarray, offsets: np.ndarray, rows: np.ndarray, fingerprint: str):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.rows = rows
+        self.fingerprint = fingerprint
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, fingerprint: str, nlist: int = 0,
+              n_iter: int = 10, sample_size: int = 100_000, seed: int = 42) -> 'IVFIndex':
+        """Entraîne les centroïdes sur un échantillon puis affecte tous les vecteurs"""
+        rng = np.random.default_rng(seed)
+        if nlist <= 0:
+            nlist = max(1, int(np.sqrt(len(vectors))))
+        nlist = min(nlist, len(vectors))
+
+        sample_rows = rng.choice(len(vectors), size=min(sample_size, len(vectors)), replace=False)
+        sample = vectors[np.sort(sample_rows)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+
+        for _ in range(n_iter):
+            assignments = _assign(sample, centroids)
+            order = np.argsort(assignments, kind='stable')
+            counts = np.bincount(assignments, minlength=nlist)
+            non_empty = np.flatnonzero(counts)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[non_empty]
+            centroids[non_empty] = np.add.reduceat(sample[order], starts, axis=0)
+            # Liste vide : réinitialisée sur un vecteur tiré au hasard
+            empty = np.flatnonzero(counts == 0)
+            if len(empty) > 0:
+                centroids[empty] = sample[rng.choice(len(sample), size=len(empty), replace=False)]
+            _normalize(centroids)
+
+        assignments = _assign(vectors, centroids)
+        rows = np.argsort(assignments, kind='stable').astype(np.int32)
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignments, minlength=nlist), out=offsets[1:])
+
+        logger.info(f"🧭 Index IVF construit: {len(vectors):,} vecteurs, {nlist} listes")
+        return cls(centroids.astype(np.float32), offsets, rows, fingerprint)
+
+    def probe(self, query: np.ndarray, nprobe: int, min_candidates: int = 0,
+              excluded_rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Lignes candidates des nprobe listes dont le centroïde est le plus proche
+
+        Les lignes exclues (articles déjà vus) sont écartées ; s'il reste moins de
+        `min_candidates` lignes, le nombre de listes sondées est doublé.
+        """
+        nprobe = max(1, min(nprobe, self.nlist))
+        list_order = np.argsort(-(self.centroids @ query))
+
+        while True:
+            rows = np.concatenate([
+                self.rows[self.offsets[list_id]:self.offsets[list_id + 1]]
+                for list_id in list_order[:nprobe]
+            ])
+            if excluded_rows is not None and len(excluded_rows) > 0:
+                rows = rows[~np.isin(rows, excluded_rows)]
+            if len(rows) >= min_candidates or nprobe >= self.nlist:
+                return rows
+            nprobe = min(nprobe * 2, self.nlist)
+
+    def save(self, path: Path):
+        """Écriture atomique de l'index"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, centroids=self.centroids, offsets=self.offsets, rows=self.rows,
+                     fingerprint=np.array(self.fingerprint))
+        os.replace(tmp_path, path)
+        logger.info(f"💾 Index IVF sauvegardé: {path}")
+
+    @classmethod
+    def load(cls, path: Path, fingerprint: str, nlist: int = 0) -> Optional['IVFIndex']:
+        """Charge l'index s'il correspond aux candidats (et au nlist demandé)"""
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                index = cls(data['centroids'], data['offsets'], data['rows'], str(data['fingerprint']))
+        except Exception as e:
+            logger.error(f"❌ Erreur lecture index IVF {path}: {e}")
+            return None
+
+        if index.fingerprint != fingerprint or (nlist > 0 and index.nlist != nlist):
+            logger.info("🔄 Index IVF obsolète (candidats ou nlist modifiés)")
+            return None
+        return index
@@ -1,6 +1,6 @@
 # backend/recommenders/base.py
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import pandas as pd
 import logging
 
@@ -39,16 +39,28 @@ class BaseRecommender(ABC):
             "metadata": article_info
         }
     
+    def _format_recommendations(self, candidates: List[Tuple[int, float, str]]) -> List[Dict[str, Any]]:
+        """Formate plusieurs recommandations (article_id, score, raison) avec une seule recherche de métadonnées"""
+        articles_info = self.data_loader.get_articles_info([article_id for article_id, _, _ in candidates])
+        
+        return [
+            {
+                "article_id": int(article_id),
+                "score": float(score),
+                "reason": reason,
+                "metadata": article_info
+            }
+            for (article_id, score, reason), article_info in zip(candidates, articles_info)
+        ]
+    
     def _get_user_seen_articles(self, user_id: int) -> set:
         """Récupère les articles déjà vus par un utilisateur"""
-        user_history = self.data_loader.get_user_history(user_id)
-        return set(user_history['click_article_id'].tolist())
+        return set(self.data_loader.get_user_article_ids(user_id).tolist())
     
     def _is_new_user(self, user_id: int) -> bool:
         """Détermine si un utilisateur est nouveau (peu d'interactions)"""
         from config import settings
-        user_history = self.data_loader.get_user_history(user_id)
-        return len(user_history) < settings.MIN_USER_INTERACTIONS
+        return self.data_loader.get_user_interaction_count(user_id) < settings.MIN_USER_INTERACTIONS
     
     def _get_available_articles(self, user_id: int, exclude_seen: bool = True) -> pd.DataFrame:
         """Récupère les articles disponibles pour recommandation"""
@@ -1,62 +1,116 @@
 # backend/recommenders/clustering.py
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import pandas as pd
 import numpy as np
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
+import copy
 import logging
+import multiprocessing
 import pickle
 import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from .base import BaseRecommender
 
 logger = logging.getLogger(__name__)
 
+
+def _fit_clusters(features: np.ndarray, n_clusters: int):
+    """Normalisation puis K-means ; exécuté dans un processus séparé si CLUSTER_TRAINING_PROCESS"""
+    scaler = StandardScaler()
+    features_scaled = scaler.fit_transform(features)
+    cluster_model = KMeans(
+        n_clusters=n_clusters,
+        random_state=42,
+        n_init=10
+    )
+    cluster_labels = cluster_model.fit_predict(features_scaled)
+    return scaler, cluster_model, cluster_labels
+
+
+class ClusterState:
+    """Résultat d'un entraînement (ou d'une mise à jour incrémentale)
+    
+    Publié en une seule affectation : une requête lit toujours un état complet,
+    l'ancien tant que le nouveau n'est pas prêt.
+    """
+    
+    FIELDS = ('user_clusters', 'cluster_model', 'scaler', 'last_training', 'cluster_characteristics',
+              'feature_categories', 'center_counts', 'reference_centers')
+    
+    def __init__(self, user_clusters: pd.DataFrame, cluster_model, scaler, last_training: datetime,
+                 cluster_characteristics: Dict, feature_categories: Optional[List[int]] = None,
+                 center_counts: Optional[np.ndarray] = None, reference_centers: Optional[np.ndarray] = None):
+        self.user_clusters = user_clusters
+        self.cluster_model = cluster_model
+        self.scaler = scaler
+        self.last_training = last_training
+        self.cluster_characteristics = cluster_characteristics
+        # Mode incrémental : catégories des features, effectifs cumulés par centroïde,
+        # et centroïdes du dernier entraînement complet (référence de la dérive)
+        self.feature_categories = feature_categories
+        self.center_counts = center_counts
+        self.reference_centers = reference_centers
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ClusterState':
+        return cls(**{field: data.get(field) for field in cls.FIELDS})
+
+
 class ClusteringRecommender(BaseRecommender):
     """Recommandeur basé sur la segmentation d'utilisateurs"""
     
     def __init__(self, data_loader):
         super().__init__(data_loader)
-        self._user_clusters = None
-        self._cluster_model = None
-        self._scaler = None
-        self._last_training = None
-        self._cluster_characteristics = None
+        # État publié (ClusterState), remplacé en bloc après chaque entraînement
+        self._state: Optional[ClusterState] = None
         self._clusters_file_path = "data/clusters_cache.pkl"
+        # Réentraînement en arrière-plan : un seul à la fois, nouvel essai différé après un échec
+        self._retrain_lock = threading.Lock()
+        self._retrain_thread = None
+        self._retry_after = 0.0
+        self._scheduler = None
+        # Classements par cluster : ((état, version des interactions, articles recommandables), classements)
+        self._rankings_state = None
 
         # Charger les clusters sauvegardés au démarrage
         self._load_clusters()
     
+    def get_state(self) -> Optional[ClusterState]:
+        """État courant des clusters (None avant le premier entraînement)"""
+        return self._state
+    
     def _should_retrain_clusters(self) -> bool:
         """Vérifie si les clusters doivent être recalculés"""
         from config import settings
         
-        if self._last_training is None:
+        state = self._state
+        if state is None or state.last_training is None:
             return True
+        if settings.CLUSTER_MODE == "incremental":
+            # Modèle tenu à jour à chaque ingestion : réentraînement complet sur dérive ou à la demande
+            return False
         
-        hours_since_training = (datetime.now() - self._last_training).total_seconds() / 3600
+        hours_since_training = (datetime.now() - state.last_training).total_seconds() / 3600
         return hours_since_training >= settings.CLUSTER_UPDATE_FREQUENCY_HOURS
 
-    def _save_clusters(self):
+    def _save_clusters(self, state: ClusterState):
         """Sauvegarde les clusters sur disque"""
-        if self._user_clusters is None:
-            return
-
         try:
             # Créer le répertoire si nécessaire
             os.makedirs(os.path.dirname(self._clusters_file_path), exist_ok=True)
 
-            # Données à sauvegarder
-            clusters_data = {
-                'user_clusters': self._user_clusters,
-                'cluster_model': self._cluster_model,
-                'scaler': self._scaler,
-                'last_training': self._last_training,
-                'cluster_characteristics': self._cluster_characteristics
-            }
-
-            with open(self._clusters_file_path, 'wb') as f:
-                pickle.dump(clusters_data, f)
+            # Écriture atomique : un worker qui démarre ne lit jamais un fichier partiel
+            tmp_path = f"{self._clusters_file_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(state.to_dict(), f)
+            os.replace(tmp_path, self._clusters_file_path)
 
             logger.info(f"💾 Clusters sauvegardés dans {self._clusters_file_path}")
 
@@ -73,53 +127,86 @@ class ClusteringRecommender(BaseRecommender):
             with open(self._clusters_file_path, 'rb') as f:
                 clusters_data = pickle.load(f)
 
-            self._user_clusters = clusters_data.get('user_clusters')
-            self._cluster_model = clusters_data.get('cluster_model')
-            self._scaler = clusters_data.get('scaler')
-            self._last_training = clusters_data.get('last_training')
-            self._cluster_characteristics = clusters_data.get('cluster_characteristics')
+            state = ClusterState.from_dict(clusters_data)
+            if state.user_clusters is None:
+                return
+            self._state = state
 
             logger.info(f"📁 Clusters chargés depuis {self._clusters_file_path}")
-            if self._last_training:
-                logger.info(f"📅 Dernier entraînement: {self._last_training}")
+            if state.last_training:
+                logger.info(f"📅 Dernier entraînement: {state.last_training}")
 
         except Exception as e:
             logger.error(f"❌ Erreur lors du chargement des clusters: {e}")
             # Réinitialiser en cas d'erreur
-            self._user_clusters = None
-            self._cluster_model = None
-            self._scaler = None
-            self._last_training = None
-            self._cluster_characteristics = None
+            self._state = None
     
-    def _build_user_features(self) -> pd.DataFrame:
-        """Construit les features des utilisateurs pour le clustering"""
+    def _build_user_features(self, user_ids=None, top_categories=None) -> pd.DataFrame:
+        """Construit les features des utilisateurs pour le clustering
+        
+        Une seule passe vectorisée : métadonnées lues dans le store dense par
+        article_id, agrégats par utilisateur par bincount / reduceat sur les
+        clics triés par utilisateur, clics par catégorie en un seul tableau croisé.
+        `user_ids` restreint le calcul à ces utilisateurs (mise à jour incrémentale),
+        avec alors les colonnes de catégories `top_categories` du modèle entraîné.
+        """
         logger.info("🔨 Construction des features utilisateurs")
         
-        interactions = self.data_loader.load_user_interactions()
-        metadata = self.data_loader.load_articles_metadata()
-        
-        # Merger interactions avec métadonnées
-        merged = interactions.merge(
-            metadata[['article_id', 'category_id', 'words_count']], 
-            left_on='click_article_id', 
-            right_on='article_id', 
-            how='left'
-        )
-        
-        # Features par utilisateur
-        user_features = merged.groupby('user_id').agg({
-            'click_article_id': ['count', 'nunique'],  # Nombre total de clics et d'articles uniques
-            'category_id': lambda x: x.nunique(),      # Diversité des catégories
-            'words_count': ['mean', 'std'],            # Préférences de longueur d'articles
-            'click_timestamp': ['min', 'max']          # Période d'activité
-        }).fillna(0)
+        store = self.data_loader.get_article_store()
         
-        # Aplatir les colonnes multi-niveaux
-        user_features.columns = [
-            'total_clicks', 'unique_articles', 'category_diversity',
-            'avg_words', 'std_words', 'first_interaction', 'last_interaction'
-        ]
+        if user_ids is None:
+            # Clics regroupés par utilisateur (tri stable, quasi gratuit sur l'index CSR déjà trié)
+            interactions = self.data_loader.load_user_interactions()
+            order = np.argsort(interactions['user_id'].to_numpy(), kind='stable')
+            user_ids = interactions['user_id'].to_numpy()[order]
+            clicked = interactions['click_article_id'].to_numpy()[order].astype(np.int64)
+            timestamps = interactions['click_timestamp'].to_numpy()[order]
+        else:
+            # Tranches de l'index CSR des seuls utilisateurs demandés
+            requested = np.unique(np.asarray(user_ids, dtype=np.int64))
+            clicked, offsets = self.data_loader.get_users_article_ids(requested)
+            timestamps, _ = self.data_loader.get_users_click_timestamps(requested)
+            user_ids = np.repeat(requested, np.diff(offsets))
+            clicked = clicked.astype(np.int64)
+        
+        users, starts, total_clicks = np.unique(user_ids, return_index=True, return_counts=True)
+        n_users = len(users)
+        owners = np.repeat(np.arange(n_users), total_clicks)
+        
+        # Métadonnées des articles cliqués (absents du store : ignorés, comme après la jointure)
+        known = store.contains_many(clicked)
+        known_owners = owners[known]
+        categories = store.columns['category_id'][clicked[known]].astype(np.int64)
+        words = store.columns['words_count'][clicked[known]].astype(np.float64)
+        known_clicks = np.bincount(known_owners, minlength=n_users)
+        
+        def distinct_per_user(user_positions: np.ndarray, values: np.ndarray) -> np.ndarray:
+            """Nombre de valeurs distinctes par utilisateur (paires uniques encodées en entier)"""
+            if len(values) == 0:
+                return np.zeros(n_users, dtype=np.int64)
+            span = int(values.max()) + 1
+            pairs = np.sort(user_positions * span + values)
+            first = np.ones(len(pairs), dtype=bool)
+            np.not_equal(pairs[1:], pairs[:-1], out=first[1:])
+            return np.bincount(pairs[first] // span, minlength=n_users)
+        
+        # Moyenne et écart-type (ddof=1) des longueurs, à partir des sommes par utilisateur
+        words_sum = np.bincount(known_owners, weights=words, minlength=n_users)
+        words_sq_sum = np.bincount(known_owners, weights=words * words, minlength=n_users)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_words = words_sum / known_clicks
+            variance = (known_clicks * words_sq_sum - words_sum ** 2) / (known_clicks * (known_clicks - 1.0))
+            std_words = np.sqrt(np.maximum(variance, 0))
+        
+        user_features = pd.DataFrame({
+            'total_clicks': total_clicks,
+            'unique_articles': distinct_per_user(owners, clicked),
+            'category_diversity': distinct_per_user(known_owners, categories),
+            'avg_words': avg_words,
+            'std_words': std_words,
+            'first_interaction': np.minimum.reduceat(timestamps, starts),
+            'last_interaction': np.maximum.reduceat(timestamps, starts)
+        }, index=pd.Index(users, name='user_id'))
         
         # Features temporelles
         user_features['activity_span_hours'] = (
@@ -130,13 +217,21 @@ class ClusteringRecommender(BaseRecommender):
             user_features['activity_span_hours'] + 1
         )  # +1 pour éviter division par 0
         
-        # Features de préférences par catégories (top 10 catégories)
-        top_categories = merged['category_id'].value_counts().head(10).index
-        
-        for cat_id in top_categories:
-            cat_clicks = merged[merged['category_id'] == cat_id].groupby('user_id')['click_article_id'].count()
-            user_features[f'cat_{cat_id}_clicks'] = cat_clicks.fillna(0)
-            user_features[f'cat_{cat_id}_ratio'] = user_features[f'cat_{cat_id}_clicks'] / user_features['total_clicks']
+        # Features de préférences par catégories (top 10 catégories) : un seul tableau croisé
+        if top_categories is None:
+            top_categories = pd.Series(categories).value_counts().head(10).index.to_numpy()
+        top_categories = np.asarray(top_categories, dtype=np.int64)
+        columns = np.full(int(max(categories.max(initial=-1), top_categories.max(initial=-1))) + 1, -1, dtype=np.int64)
+        columns[top_categories] = np.arange(len(top_categories))
+        in_top = columns[categories] >= 0
+        category_clicks = np.bincount(
+            known_owners[in_top] * len(top_categories) + columns[categories[in_top]],
+            minlength=n_users * len(top_categories)
+        ).reshape(n_users, len(top_categories))
+        
+        for column, cat_id in enumerate(top_categories.tolist()):
+            user_features[f'cat_{cat_id}_clicks'] = category_clicks[:, column].astype(np.float64)
+            user_features[f'cat_{cat_id}_ratio'] = category_clicks[:, column] / total_clicks
         
         # Nettoyer les features
         user_features = user_features.fillna(0)
@@ -145,44 +240,46 @@ class ClusteringRecommender(BaseRecommender):
         logger.info(f"🔨 Features construites: {len(user_features)} utilisateurs, {len(user_features.columns)} features")
         return user_features
     
+    def _fit(self, features: np.ndarray, n_clusters: int):
+        """(scaler, modèle, labels) : K-means dans un processus séparé si CLUSTER_TRAINING_PROCESS
+        
+        Démarrage en "spawn" (pas de fork d'un serveur multi-threadé) ; le calcul ne
+        tient pas le GIL du processus qui sert les requêtes.
+        """
+        from config import settings
+        
+        if not settings.CLUSTER_TRAINING_PROCESS:
+            return _fit_clusters(features, n_clusters)
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            return executor.submit(_fit_clusters, features, n_clusters).result()
+    
     def _train_clusters(self):
-        """Entraîne le modèle de clustering"""
+        """Entraîne le modèle de clustering, puis publie le nouvel état en une affectation"""
         from config import settings
         
         logger.info(f"🧠 Entraînement du clustering ({settings.N_USER_CLUSTERS} clusters)")
         
+        # L'entraînement complet couvre les utilisateurs en attente de mise à jour incrémentale
+        self.data_loader.take_updated_users()
+        
         # Construire les features
         user_features = self._build_user_features()
         
         if len(user_features) == 0:
+            # Pas de nouvel essai avant le délai (planificateur et requêtes)
+            self._retry_after = time.monotonic() + settings.CLUSTER_RETRY_DELAY_SECONDS
             logger.error("❌ Aucune feature utilisateur disponible")
             return
         
-        # Normalisation
-        self._scaler = StandardScaler()
-        features_scaled = self._scaler.fit_transform(user_features.values)
-        
-        # Clustering K-means
-        self._cluster_model = KMeans(
-            n_clusters=settings.N_USER_CLUSTERS, 
-            random_state=42,
-            n_init=10
-        )
-        
-        cluster_labels = self._cluster_model.fit_predict(features_scaled)
-        
-        # Sauvegarder les assignations
-        self._user_clusters = pd.DataFrame({
-            'user_id': user_features.index,
-            'cluster': cluster_labels
-        }).set_index('user_id')
+        # Normalisation et K-means
+        scaler, cluster_model, cluster_labels = self._fit(user_features.values, settings.N_USER_CLUSTERS)
         
         # Calculer les caractéristiques des clusters
-        self._cluster_characteristics = {}
+        cluster_characteristics = {}
         for cluster_id in range(settings.N_USER_CLUSTERS):
             cluster_users = user_features[cluster_labels == cluster_id]
             
-            self._cluster_characteristics[cluster_id] = {
+            cluster_characteristics[cluster_id] = {
                 'size': len(cluster_users),
                 'avg_clicks': cluster_users['total_clicks'].mean(),
                 'avg_diversity': cluster_users['category_diversity'].mean(),
@@ -190,103 +287,369 @@ class ClusteringRecommender(BaseRecommender):
                 'activity_level': cluster_users['clicks_per_hour'].mean()
             }
         
-        self._last_training = datetime.now()
-        logger.info(f"🧠 Clustering terminé: {len(self._user_clusters)} utilisateurs assignés")
+        state = ClusterState(
+            user_clusters=pd.DataFrame({
+                'user_id': user_features.index,
+                'cluster': cluster_labels
+            }).set_index('user_id'),
+            cluster_model=cluster_model,
+            scaler=scaler,
+            last_training=datetime.now(),
+            cluster_characteristics=cluster_characteristics,
+            feature_categories=[
+                int(column[len('cat_'):-len('_clicks')]) for column in user_features.columns
+                if column.startswith('cat_') and column.endswith('_clicks')
+            ],
+            center_counts=np.bincount(cluster_labels, minlength=settings.N_USER_CLUSTERS).astype(np.float64),
+            reference_centers=cluster_model.cluster_centers_.copy()
+        )
+        self._state = state
+        logger.info(f"🧠 Clustering terminé: {len(state.user_clusters)} utilisateurs assignés")
 
         # Sauvegarder les clusters après entraînement
-        self._save_clusters()
+        self._save_clusters(state)
+        self._refresh_rankings(state)
         
         # Log des caractéristiques
-        for cluster_id, chars in self._cluster_characteristics.items():
+        for cluster_id, chars in cluster_characteristics.items():
             logger.info(f"📊 Cluster {cluster_id}: {chars['size']} users, "
                        f"{chars['avg_clicks']:.1f} clics moy., "
                        f"{chars['avg_diversity']:.1f} catégories moy.")
     
-    def _get_user_cluster(self, user_id: int) -> int:
+    @staticmethod
+    def _nearest_centers(features: np.ndarray, centers: np.ndarray) -> np.ndarray:
+        """Indice du centroïde le plus proche de chaque ligne"""
+        distances = (centers ** 2).sum(axis=1) - 2 * features @ centers.T
+        return distances.argmin(axis=1)
+    
+    def update_clusters(self, user_ids) -> Dict[str, Any]:
+        """Mise à jour incrémentale à partir des utilisateurs touchés par les dernières ingestions
+        
+        Les centroïdes sont déplacés par mini-lots (moyenne mobile pondérée par
+        l'effectif cumulé de chaque centroïde, comme MiniBatchKMeans) sur les
+        features recalculées de ces seuls utilisateurs, qui sont ensuite réassignés ;
+        les autres gardent leur cluster. Si un centroïde s'est éloigné de sa position
+        au dernier entraînement complet de plus de CLUSTER_DRIFT_THRESHOLD × la plus
+        petite distance entre centroïdes, le modèle est réentraîné entièrement en
+        arrière-plan (schedule_retrain), l'état courant continuant de servir.
+        """
+        from config import settings
+        
+        user_ids = np.unique(np.asarray(user_ids, dtype=np.int64))
+        if len(user_ids) == 0:
+            return {"mode": "incremental", "updated_users": 0}
+        
+        with self.data_loader.loads.exclusive("clusters"):
+            state = self._state
+            if state is None or state.center_counts is None or state.feature_categories is None:
+                logger.info("🔄 Pas de modèle incrémental disponible, entraînement complet en arrière-plan")
+                return self._schedule_full_update(user_ids, "no_model")
+            
+            user_features = self._build_user_features(user_ids, state.feature_categories)
+            features_scaled = state.scaler.transform(user_features.values)
+            centers = state.cluster_model.cluster_centers_.copy()
+            counts = state.center_counts.copy()
+            
+            rng = np.random.default_rng(len(user_ids))
+            order = rng.permutation(len(features_scaled))
+            for start in range(0, len(order), settings.CLUSTER_MINIBATCH_SIZE):
+                batch = features_scaled[order[start:start + settings.CLUSTER_MINIBATCH_SIZE]]
+                labels = self._nearest_centers(batch, centers)
+                batch_counts = np.bincount(labels, minlength=len(centers))
+                batch_sums = np.zeros_like(centers)
+                np.add.at(batch_sums, labels, batch)
+                counts += batch_counts
+                moved = batch_counts > 0
+                centers[moved] += (batch_sums[moved] - batch_counts[moved, None] * centers[moved]) / counts[moved, None]
+            
+            reference = state.reference_centers
+            separation = np.linalg.norm(reference[:, None, :] - reference[None, :, :], axis=2)
+            separation = separation[~np.eye(len(reference), dtype=bool)].min() if len(reference) > 1 else 1.0
+            drift = float(np.linalg.norm(centers - reference, axis=1).max() / max(separation, 1e-12))
+            
+            if drift > settings.CLUSTER_DRIFT_THRESHOLD:
+                logger.info(f"🔄 Dérive des clusters {drift:.3f} > {settings.CLUSTER_DRIFT_THRESHOLD}, "
+                            f"entraînement complet en arrière-plan")
+                result = self._schedule_full_update(user_ids, "drift")
+                result["drift"] = round(drift, 4)
+                return result
+            
+            # Réassignation des seuls utilisateurs touchés ; l'état publié n'est jamais
+            # modifié en place, les requêtes en cours gardent une vue cohérente
+            labels = pd.Series(self._nearest_centers(features_scaled, centers), index=user_features.index)
+            clusters = state.user_clusters['cluster']
+            clusters = pd.concat([clusters.drop(labels.index, errors='ignore'), labels]).sort_index()
+            cluster_model = copy.copy(state.cluster_model)
+            cluster_model.cluster_centers_ = centers
+            
+            sizes = np.bincount(clusters.to_numpy(), minlength=len(centers))
+            cluster_characteristics = {
+                cluster_id: {**chars, 'size': int(sizes[cluster_id])}
+                for cluster_id, chars in state.cluster_characteristics.items()
+            }
+            state = ClusterState(
+                user_clusters=clusters.rename('cluster').to_frame(),
+                cluster_model=cluster_model,
+                scaler=state.scaler,
+                last_training=state.last_training,
+                cluster_characteristics=cluster_characteristics,
+                feature_categories=state.feature_categories,
+                center_counts=counts,
+                reference_centers=state.reference_centers
+            )
+            self._state = state
+            self._save_clusters(state)
+            self._refresh_rankings(state)
+        
+        logger.info(f"🧩 Clusters mis à jour: {len(user_features):,} utilisateurs réassignés (dérive {drift:.3f})")
+        return {"mode": "incremental", "updated_users": len(user_features), "drift": round(drift, 4)}
+    
+    def _schedule_full_update(self, user_ids: np.ndarray, reason: str) -> Dict[str, Any]:
+        """Remplace une mise à jour incrémentale par un réentraînement complet en arrière-plan
+        
+        Si aucun entraînement n'a pu démarrer (déjà en cours, ou délai après échec),
+        les utilisateurs sont remis en attente pour la prochaine mise à jour.
+        """
+        scheduled = self.schedule_retrain(force=True)
+        if not scheduled:
+            self.data_loader.requeue_updated_users(user_ids)
+        return {"mode": "full_scheduled", "reason": reason, "scheduled": scheduled, "updated_users": len(user_ids)}
+    
+    def ensure_trained(self):
+        """Garantit un modèle servable ; un modèle périmé est réentraîné en arrière-plan
+        
+        Seul le tout premier entraînement bloque (les requêtes concurrentes attendent
+        son résultat) ; ensuite l'ancien modèle sert jusqu'à la publication du nouveau.
+        """
+        if self._state is None:
+            if time.monotonic() < self._retry_after:
+                return
+            self.data_loader.loads.ensure(
+                "clusters",
+                self._train_clusters,
+                is_loaded=lambda: self._state is not None
+            )
+        elif self._should_retrain_clusters():
+            self.schedule_retrain()
+    
+    def schedule_retrain(self, force: bool = False) -> bool:
+        """Lance un réentraînement en arrière-plan s'il n'y en a pas déjà un en cours
+        
+        force : réentraîne même si le modèle n'est pas périmé (dérive en mode incrémental).
+        Retourne True si un thread a été démarré.
+        """
+        with self._retrain_lock:
+            if self._retrain_thread is not None and self._retrain_thread.is_alive():
+                return False
+            if time.monotonic() < self._retry_after:
+                return False
+            self._retrain_thread = threading.Thread(target=self._background_retrain, args=(force,),
+                                                    name="cluster-retrain", daemon=True)
+            self._retrain_thread.start()
+            return True
+    
+    def _background_retrain(self, force: bool = False):
+        """Corps du thread de réentraînement : publie le nouvel état ou garde l'ancien"""
+        from config import settings
+        
+        logger.info("🔄 Réentraînement des clusters en arrière-plan")
+        previous = self._state
+        start = time.perf_counter()
+        try:
+            self.data_loader.loads.ensure(
+                "clusters",
+                self._train_clusters,
+                is_loaded=(lambda: False) if force else (lambda: not self._should_retrain_clusters())
+            )
+        except Exception as e:
+            # L'ancien modèle continue de servir ; nouvel essai après le délai
+            self._retry_after = time.monotonic() + settings.CLUSTER_RETRY_DELAY_SECONDS
+            logger.error(f"❌ Réentraînement des clusters échoué, modèle précédent conservé: {e}")
+            return
+        if self._state is previous:
+            logger.warning("⚠️ Aucun nouveau modèle de clusters publié")
+            return
+        logger.info(f"✅ Nouveau modèle de clusters publié en {time.perf_counter() - start:.1f}s")
+    
+    def start_scheduler(self, interval_minutes: float):
+        """Vérifie périodiquement la fraîcheur du modèle et déclenche le réentraînement"""
+        if interval_minutes <= 0 or self._scheduler is not None:
+            return
+        
+        def run():
+            while True:
+                time.sleep(interval_minutes * 60)
+                try:
+                    if self._state is not None and self._should_retrain_clusters():
+                        self.schedule_retrain()
+                except Exception as e:
+                    logger.error(f"❌ Erreur du planificateur de clusters: {e}")
+        
+        self._scheduler = threading.Thread(target=run, name="cluster-scheduler", daemon=True)
+        self._scheduler.start()
+        logger.info(f"⏰ Vérification des clusters toutes les {interval_minutes:g} min")
+    
+    def refresh_rankings(self):
+        """Recalcule les classements après une ingestion de clics, sans déclencher d'entraînement
+        
+        Appelé par le chemin d'ingestion dans tous les modes : la première requête
+        qui suit ne paie pas le calcul (qui reste un repli paresseux).
+        """
+        state = self._state
+        if state is not None:
+            self._refresh_rankings(state)
+    
+    def _refresh_rankings(self, state: ClusterState):
+        """Reconstruit les classements pour un état qui vient d'être publié (hors du chemin des requêtes)"""
+        try:
+            self.get_cluster_rankings(state)
+        except Exception as e:
+            logger.error(f"❌ Erreur lors du calcul des classements par cluster: {e}")
+    
+    def get_cluster_rankings(self, state: Optional[ClusterState] = None) -> Dict[int, pd.Series]:
+        """Classement matérialisé des articles de chaque cluster
+        
+        Pour chaque cluster, score 0.6 × utilisateurs uniques + 0.4 × clics sur les
+        articles recommandables, trié par score décroissant. Réutilisé tant que
+        l'état des clusters, la version des interactions et les articles
+        recommandables ne changent pas. Les Series retournées sont partagées :
+        ne pas les modifier.
+        """
+        if state is None:
+            self.ensure_trained()
+            state = self._state
+        if state is None:
+            return {}
+        
+        version = self.data_loader.get_data_version()
+        recommendable = self.data_loader.get_recommendable_articles()
+        
+        def is_current(cached) -> bool:
+            return (cached is not None and cached[0][0] is state
+                    and cached[0][1] == version and cached[0][2] is recommendable)
+        
+        cached = self._rankings_state
+        if not is_current(cached):
+            # Un seul calcul à la fois, les requêtes concurrentes attendent son résultat
+            self.data_loader.loads.ensure(
+                "cluster_rankings",
+                lambda: self._build_rankings(state, version, recommendable),
+                is_loaded=lambda: is_current(self._rankings_state)
+            )
+            cached = self._rankings_state
+        return cached[1]
+    
+    def _build_rankings(self, state: ClusterState, version: int, recommendable: pd.DataFrame):
+        """Calcule les classements de tous les clusters en une passe sur les interactions"""
+        start = time.perf_counter()
+        interactions = self.data_loader.load_user_interactions()
+        n_clusters = len(state.cluster_characteristics)
+        rankings = {}
+        
+        if len(interactions) > 0:
+            user_ids = interactions['user_id'].to_numpy().astype(np.int64)
+            article_ids = interactions['click_article_id'].to_numpy().astype(np.int64)
+            
+            # Cluster de chaque clic (-1 : utilisateur non assigné, ignoré)
+            assigned = state.user_clusters.index.to_numpy().astype(np.int64)
+            cluster_of = np.full(max(int(user_ids.max()), int(assigned.max(initial=-1))) + 1, -1, dtype=np.int64)
+            cluster_of[assigned] = state.user_clusters['cluster'].to_numpy()
+            clusters = cluster_of[user_ids]
+            known = clusters >= 0
+            clusters, user_ids, article_ids = clusters[known], user_ids[known], article_ids[known]
+            
+            n_articles = int(article_ids.max(initial=-1)) + 1
+            total_clicks = np.bincount(clusters * n_articles + article_ids, minlength=n_clusters * n_articles)
+            
+            # Utilisateurs uniques : couples (utilisateur, article) distincts, par tri
+            pairs = np.sort(user_ids * n_articles + article_ids)
+            first = np.ones(len(pairs), dtype=bool)
+            np.not_equal(pairs[1:], pairs[:-1], out=first[1:])
+            pairs = pairs[first]
+            unique_users = np.bincount(cluster_of[pairs // n_articles] * n_articles + pairs % n_articles,
+                                       minlength=n_clusters * n_articles)
+            
+            recommendable_mask = np.zeros(n_articles, dtype=bool)
+            recommendable_ids = recommendable['article_id'].to_numpy().astype(np.int64)
+            recommendable_mask[recommendable_ids[recommendable_ids < n_articles]] = True
+            
+            for cluster_id in range(n_clusters):
+                clicks = total_clicks[cluster_id * n_articles:(cluster_id + 1) * n_articles]
+                users = unique_users[cluster_id * n_articles:(cluster_id + 1) * n_articles]
+                clicked = np.flatnonzero(clicks)
+                scores = pd.Series(0.6 * users[clicked] + 0.4 * clicks[clicked], index=clicked)
+                # Tri sur tous les articles cliqués puis filtrage : même ordre des ex aequo
+                # que le calcul par groupby
+                scores = scores.sort_values(ascending=False)
+                rankings[cluster_id] = scores[recommendable_mask[scores.index.to_numpy()]]
+        
+        self._rankings_state = ((state, version, recommendable), rankings)
+        logger.info(f"🏆 Classements par cluster calculés en {time.perf_counter() - start:.2f}s: "
+                    f"{sum(len(ranking) for ranking in rankings.values()):,} articles")
+    
+    def _get_user_cluster(self, user_id: int, state: Optional[ClusterState] = None) -> int:
         """Récupère le cluster d'un utilisateur"""
-        if self._should_retrain_clusters():
-            self._train_clusters()
+        if state is None:
+            self.ensure_trained()
+            state = self._state
         
-        if self._user_clusters is None or user_id not in self._user_clusters.index:
+        if state is None or user_id not in state.user_clusters.index:
             # Utilisateur non trouvé, assigner au cluster le plus général
             logger.warning(f"⚠️ User {user_id} non trouvé dans les clusters, assignation au cluster 0")
             return 0
         
-        return self._user_clusters.loc[user_id, 'cluster']
+        return state.user_clusters.loc[user_id, 'cluster']
     
     def recommend(self, user_id: int, n_recommendations: int = 5, **kwargs) -> List[Dict[str, Any]]:
         """Recommande des articles populaires dans le cluster de l'utilisateur"""
         logger.info(f"👥 Recommandation par clustering pour user {user_id}")
         
-        # Récupérer le cluster de l'utilisateur
-        user_cluster = self._get_user_cluster(user_id)
-        logger.debug(f"👤 User {user_id} → Cluster {user_cluster}")
-        
-        if self._user_clusters is None:
+        # Un seul état pour toute la requête, même si un nouveau modèle est publié entre-temps
+        self.ensure_trained()
+        state = self._state
+        if state is None:
             logger.error("❌ Clusters non disponibles")
             return []
         
-        # Récupérer les utilisateurs du même cluster
-        cluster_users = self._user_clusters[self._user_clusters['cluster'] == user_cluster].index.tolist()
-        logger.debug(f"👥 Cluster {user_cluster}: {len(cluster_users)} utilisateurs")
+        # Récupérer le cluster de l'utilisateur
+        user_cluster = self._get_user_cluster(user_id, state)
+        logger.debug(f"👤 User {user_id} → Cluster {user_cluster}")
         
-        # Récupérer les interactions de ces utilisateurs
-        interactions = self.data_loader.load_user_interactions()
-        cluster_interactions = interactions[interactions['user_id'].isin(cluster_users)]
+        # Classement précalculé du cluster (articles recommandables, score décroissant)
+        ranking = self.get_cluster_rankings(state).get(user_cluster)
         
-        if len(cluster_interactions) == 0:
+        if ranking is None or len(ranking) == 0:
             logger.warning(f"⚠️ Aucune interaction pour le cluster {user_cluster}")
             return []
         
-        # Calculer la popularité des articles dans ce cluster
-        article_popularity = cluster_interactions.groupby('click_article_id').agg({
-            'user_id': 'nunique',
-            'click_timestamp': 'count'
-        }).rename(columns={
-            'user_id': 'unique_users',
-            'click_timestamp': 'total_clicks'
-        })
-        
-        article_popularity['cluster_score'] = (
-            0.6 * article_popularity['unique_users'] + 
-            0.4 * article_popularity['total_clicks']
-        )
-        
-        article_popularity = article_popularity.sort_values('cluster_score', ascending=False)
-        
-        # Exclure les articles déjà vus
+        # Exclure les articles déjà vus : au plus len(seen) articles retirés en tête
         if kwargs.get('exclude_seen', True):
-            seen_articles = self._get_user_seen_articles(user_id)
-            available_articles = article_popularity[~article_popularity.index.isin(seen_articles)]
+            seen_articles = self.data_loader.get_user_article_ids(user_id)
+            head = ranking.iloc[:n_recommendations + len(seen_articles)]
+            available_articles = head[~np.isin(head.index.to_numpy(), seen_articles)]
         else:
-            available_articles = article_popularity
-        
-        # Vérifier que les articles sont recommandables (âge, qualité)
-        recommendable_articles = self.data_loader.get_recommendable_articles()
-        recommendable_ids = set(recommendable_articles['article_id'].tolist())
-        available_articles = available_articles[available_articles.index.isin(recommendable_ids)]
+            available_articles = ranking
         
         # Générer les recommandations
-        recommendations = []
-        cluster_chars = self._cluster_characteristics.get(user_cluster, {})
+        candidates = []
+        cluster_chars = state.cluster_characteristics.get(user_cluster, {})
         
-        for i, (article_id, row) in enumerate(available_articles.head(n_recommendations).iterrows()):
+        for i, (article_id, score) in enumerate(available_articles.head(n_recommendations).items()):
             reason = (f"Populaire dans votre segment (#{i+1}) - "
                      f"Cluster {user_cluster} ({cluster_chars.get('size', 0)} utilisateurs similaires)")
-            
-            recommendations.append(self._format_recommendation(
-                article_id=article_id,
-                score=row['cluster_score'],
-                reason=reason
-            ))
+            candidates.append((article_id, score, reason))
+        
+        recommendations = self._format_recommendations(candidates)
         
         logger.info(f"👥 {len(recommendations)} recommandations par clustering générées")
         return recommendations
     
     def get_user_segment_info(self, user_id: int) -> Dict:
         """Retourne les informations du segment de l'utilisateur"""
-        cluster = self._get_user_cluster(user_id)
-        characteristics = self._cluster_characteristics.get(cluster, {})
+        self.ensure_trained()
+        state = self._state
+        cluster = self._get_user_cluster(user_id, state)
+        characteristics = state.cluster_characteristics.get(cluster, {}) if state is not None else {}
 
         return {
             "user_id": user_id,
@@ -298,8 +661,8 @@ class ClusteringRecommender(BaseRecommender):
     def force_retrain_clusters(self):
         """Force le recalcul des clusters (ignorer la fréquence configurée)"""
         logger.info("🔄 Recalcul forcé des clusters")
-        self._last_training = None
-        self._train_clusters()
+        with self.data_loader.loads.exclusive("clusters"):
+            self._train_clusters()
 
     def clear_clusters_cache(self):
         """Supprime le fichier de cache des clusters"""
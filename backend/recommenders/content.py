@@ -1,104 +1,636 @@
 # backend/recommenders/content.py
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import pandas as pd
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+import hashlib
 import logging
 from .base import BaseRecommender
+from .ann import IVFIndex, IVF_INDEX_FILENAME, fingerprint, fingerprint_rows
+from .neighbors import ItemNeighbors, NEIGHBORS_DIRNAME
+from .profiles import (ProfileCache, ProfileMatrix, PROFILE_MATRIX_DIRNAME, build_profile_matrix,
+                       decay_weights)
+from .projection import Projection, PROJECTION_FILENAME, embeddings_fingerprint, load_or_fit
+from .quantization import Int8Matrix
 
 logger = logging.getLogger(__name__)
 
+# Clics récents moyennés dans le profil d'un utilisateur
+PROFILE_RECENT_CLICKS = 10
+# Lignes reconstruites en pleine précision par bloc (mode quantifié)
+_EXACT_BLOCK_ROWS = 16384
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions des k meilleurs scores, triées par score décroissant
+
+    Sélection partielle (argpartition, O(n)) puis tri des seuls k retenus ;
+    à score égal, la position la plus petite passe en premier.
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    
+    if k < len(scores):
+        best = np.argpartition(-scores, k - 1)[:k]
+    else:
+        best = np.arange(len(scores))
+    return best[np.lexsort((best, -scores[best]))]
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """top_k appliqué à chaque ligne d'une matrice de scores (mêmes règles d'égalité)"""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.zeros((len(scores), 0), dtype=np.int64)
+    
+    if k < scores.shape[1]:
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best.sort(axis=1)
+    else:
+        best = np.broadcast_to(np.arange(scores.shape[1]), scores.shape).copy()
+    order = np.argsort(-np.take_along_axis(scores, best, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(best, order, axis=1)
+
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    """Copie float32 L2-normalisée ; les vecteurs nuls restent nuls (similarité 0)"""
+    vectors = np.array(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def _prepare(embeddings: np.ndarray, projection: Optional[Projection]) -> np.ndarray:
+    """Embeddings bruts → vecteurs candidats : projetés si demandé, puis normalisés"""
+    if projection is not None:
+        embeddings = projection.transform(embeddings)
+    return _normalized(embeddings)
+
+
+class CandidateMatrix:
+    """Embeddings L2-normalisés des articles recommandables, une ligne par article
+    
+    La similarité cosinus avec un profil normalisé se réduit à un produit
+    matrice-vecteur ; `positions` associe un article_id à sa ligne (-1 si absent).
+    En mode quantifié, seule la version int8 est résidente : le scan est approché
+    puis une courte liste est re-classée en pleine précision depuis les embeddings
+    mappés en mémoire.
+    """
+    
+    def __init__(self, source: pd.DataFrame, article_ids: np.ndarray, vectors: Optional[np.ndarray],
+                 n_articles: int, embeddings: np.ndarray = None, quantized: Optional[Int8Matrix] = None,
+                 projection: Optional[Projection] = None):
+        self.source = source
+        self.article_ids = article_ids
+        self._vectors = vectors
+        self._embeddings = embeddings
+        self.quantized = quantized
+        self.projection = projection
+        if projection is not None:
+            self.dim = projection.dim
+        else:
+            self.dim = embeddings.shape[1] if embeddings is not None else vectors.shape[1]
+        self.reused = 0
+        self.positions = np.full(n_articles, -1, dtype=np.int32)
+        self.positions[article_ids] = np.arange(len(article_ids), dtype=np.int32)
+    
+    @classmethod
+    def build(cls, recommendable: pd.DataFrame, embeddings: np.ndarray, quantization: str = "none",
+              previous: Optional['CandidateMatrix'] = None,
+              projection: Optional[Projection] = None) -> 'CandidateMatrix':
+        """Extrait, projette si demandé, normalise (puis quantifie) les embeddings des articles recommandables
+        
+        Avec `previous` (matrice de l'ensemble recommandable précédent), les lignes des
+        articles toujours recommandables sont recopiées depuis le bloc contigu existant :
+        seuls les articles entrants sont relus dans les embeddings et normalisés.
+        """
+        article_ids = recommendable['article_id'].to_numpy().astype(np.int64)
+        article_ids = article_ids[(article_ids >= 0) & (article_ids < len(embeddings))]
+        
+        reused = np.full(len(article_ids), -1, dtype=np.int32)
+        if (previous is not None and previous.quantization == quantization
+                and previous.projection is projection and previous._embeddings is embeddings):
+            reused = previous.rows_of(article_ids)
+        kept = np.flatnonzero(reused >= 0)
+        added = np.flatnonzero(reused < 0)
+        dim = projection.dim if projection is not None else embeddings.shape[1]
+        
+        if quantization == "int8":
+            # Par blocs : la matrice float32 complète n'est jamais matérialisée
+            quantized = Int8Matrix.empty(len(article_ids), dim)
+            if len(kept):
+                quantized.codes[kept] = previous.quantized.codes[reused[kept]]
+                quantized.scales[kept] = previous.quantized.scales[reused[kept]]
+            for start in range(0, len(added), 16384):
+                rows = added[start:start + 16384]
+                quantized.assign(rows, _prepare(embeddings[article_ids[rows]], projection))
+            candidates = cls(recommendable, article_ids, None, len(embeddings), embeddings, quantized, projection)
+        else:
+            vectors = np.empty((len(article_ids), dim), dtype=np.float32)
+            if len(kept):
+                vectors[kept] = previous.vectors[reused[kept]]
+            vectors[added] = _prepare(embeddings[article_ids[added]], projection)
+            candidates = cls(recommendable, article_ids, vectors, len(embeddings), embeddings, projection=projection)
+        
+        candidates.reused = len(kept)
+        return candidates
+    
+    @property
+    def quantization(self) -> str:
+        return "none" if self.quantized is None else "int8"
+    
+    @property
+    def vectors(self) -> np.ndarray:
+        """Matrice dense normalisée (matérialisée à la demande en mode quantifié)"""
+        if self._vectors is None:
+            logger.warning("⚠️ Matrice dense des candidats matérialisée malgré la quantification")
+            self._vectors = self.exact_vectors(slice(None))
+        return self._vectors
+    
+    @property
+    def nbytes(self) -> int:
+        """Mémoire résidente des vecteurs candidats"""
+        if self._vectors is not None:
+            return self._vectors.nbytes
+        return self.quantized.nbytes
+    
+    def exact_vectors(self, rows) -> np.ndarray:
+        """Vecteurs normalisés en pleine précision des lignes demandées (indices ou slice)"""
+        if self._vectors is not None:
+            return self._vectors[rows]
+        return _prepare(self._embeddings[self.article_ids[rows]], self.projection)
+    
+    def project(self, profiles: np.ndarray) -> np.ndarray:
+        """Profil(s) normalisé(s) (vecteur ou matrice) exprimés dans l'espace des candidats"""
+        profiles = profiles.astype(np.float32, copy=False)
+        if self.projection is None:
+            return profiles
+        projected = _prepare(self.projection.transform(profiles).reshape(-1, self.dim), None)
+        return projected.reshape(profiles.shape[:-1] + (self.dim,))
+    
+    def fingerprint(self) -> str:
+        """Empreinte identique en mode dense et quantifié (index et tables persistés)"""
+        sample = self.exact_vectors(fingerprint_rows(len(self.article_ids)))
+        return fingerprint(self.article_ids, self.dim, sample)
+    
+    def scan(self, query: np.ndarray, k: int, excluded_rows: Optional[np.ndarray] = None,
+             rerank_size: int = 0) -> Tuple[Optional[np.ndarray], np.ndarray]:
+        """Scores de toutes les lignes, ou d'une courte liste re-classée en mode quantifié
+        
+        Returns:
+            (lignes évaluées ou None pour toutes, scores exacts ; -inf pour les exclues)
+        """
+        if self.quantized is None:
+            scores = self.vectors @ query
+            if excluded_rows is not None:
+                scores[excluded_rows] = -np.inf
+            return None, scores
+        
+        approximate = self.quantized.dot(query)
+        if excluded_rows is not None:
+            approximate[excluded_rows] = -np.inf
+        shortlist = top_k(approximate, max(k, rerank_size))
+        # Ordre des lignes : départage des égalités identique au scan exact
+        rows = np.sort(shortlist[np.isfinite(approximate[shortlist])])
+        return rows, self.exact_vectors(rows) @ query
+    
+    def score_many(self, queries: np.ndarray) -> np.ndarray:
+        """Scores exacts de plusieurs requêtes (requêtes × lignes)
+        
+        En mode quantifié, par blocs de lignes recalculés en pleine précision :
+        la matrice dense n'est jamais conservée.
+        """
+        if self._vectors is not None:
+            return queries @ self._vectors.T
+        scores = np.empty((len(queries), len(self.article_ids)), dtype=np.float32)
+        for start in range(0, len(self.article_ids), _EXACT_BLOCK_ROWS):
+            rows = slice(start, start + _EXACT_BLOCK_ROWS)
+            scores[:, rows] = queries @ self.exact_vectors(rows).T
+        return scores
+    
+    def rows_of(self, article_ids: np.ndarray) -> np.ndarray:
+        """Ligne de chaque article_id (alignée sur l'entrée, -1 si absent)"""
+        article_ids = np.asarray(article_ids, dtype=np.int64)
+        in_range = (article_ids >= 0) & (article_ids < len(self.positions))
+        rows = np.full(len(article_ids), -1, dtype=np.int32)
+        rows[in_range] = self.positions[article_ids[in_range]]
+        return rows
+    
+    def positions_of(self, article_ids: np.ndarray) -> np.ndarray:
+        """Lignes des article_id présents dans la matrice"""
+        rows = self.rows_of(article_ids)
+        return rows[rows >= 0]
+
+
 class ContentRecommender(BaseRecommender):
     """Recommandeur basé sur la similarité de contenu"""
     
     def __init__(self, data_loader):
+        from config import settings
+        
         super().__init__(data_loader)
-        self._similarity_cache = {}
+        self._profiles = ProfileCache(settings.PROFILE_CACHE_SIZE)
+        self._candidates = None
+        # Projection des embeddings (CONTENT_PROJECTION), partagée par les reconstructions
+        self._projection = None
+        # (matrice des candidats indexée, index IVF) : l'index suit la matrice
+        self._ann_state = None
+        # (matrice des candidats, table des voisins ou None si absente/obsolète)
+        self._neighbors_state = None
+        # (matrice des profils précalculés ou None si absente/obsolète,)
+        self._profile_matrix_state = None
+    
+    def get_candidates(self) -> CandidateMatrix:
+        """Matrice des candidats, reconstruite quand les articles recommandables changent"""
+        recommendable = self.data_loader.get_recommendable_articles()
+        candidates = self._candidates
+        if candidates is None or candidates.source is not recommendable:
+            self.data_loader.loads.ensure(
+                "content_candidates",
+                lambda: self._build_candidates(recommendable),
+                is_loaded=lambda: self._candidates is not None and self._candidates.source is recommendable
+            )
+            candidates = self._candidates
+        return candidates
+    
+    def _build_candidates(self, recommendable: pd.DataFrame):
+        from config import settings
+        
+        embeddings = self.data_loader.load_articles_embeddings()
+        candidates = CandidateMatrix.build(
+            recommendable, embeddings, settings.CONTENT_QUANTIZATION, previous=self._candidates,
+            projection=self._get_projection(embeddings)
+        )
+        self._candidates = candidates
+        logger.info(f"📐 Matrice des candidats normalisée: {len(candidates.article_ids):,} × "
+                    f"{candidates.dim} ({settings.CONTENT_QUANTIZATION}, "
+                    f"{candidates.nbytes / 1024 ** 2:.0f} Mo, {candidates.reused:,} lignes réutilisées)")
+    
+    def _get_projection(self, embeddings: np.ndarray) -> Optional[Projection]:
+        """Projection des embeddings (CONTENT_PROJECTION), chargée ou ajustée une seule fois"""
+        from config import settings
+        
+        if settings.CONTENT_PROJECTION == "none":
+            return None
+        if self._projection is None:
+            self._projection = load_or_fit(
+                settings.CACHE_PATH / PROJECTION_FILENAME, embeddings,
+                settings.CONTENT_PROJECTION, settings.CONTENT_PROJECTION_DIM
+            )
+        return self._projection
+    
+    def get_ann_index(self, candidates: CandidateMatrix = None) -> IVFIndex:
+        """Index IVF des candidats, chargé depuis le disque ou construit au besoin"""
+        if candidates is None:
+            candidates = self.get_candidates()
+        state = self._ann_state
+        if state is None or state[0] is not candidates:
+            self.data_loader.loads.ensure(
+                "content_ivf_index",
+                lambda: self._build_ann_index(candidates),
+                is_loaded=lambda: self._ann_state is not None and self._ann_state[0] is candidates
+            )
+            state = self._ann_state
+        return state[1]
+    
+    def _build_ann_index(self, candidates: CandidateMatrix):
+        from config import settings
+        
+        index_path = settings.CACHE_PATH / IVF_INDEX_FILENAME
+        candidates_fingerprint = candidates.fingerprint()
+        
+        index = IVFIndex.load(index_path, candidates_fingerprint, nlist=settings.CONTENT_IVF_NLIST)
+        if index is None:
+            # En int8, copie pleine précision temporaire : libérée après l'entraînement
+            index = IVFIndex.build(candidates.exact_vectors(slice(None)), candidates_fingerprint,
+                                   nlist=settings.CONTENT_IVF_NLIST)
+            try:
+                index.save(index_path)
+            except Exception as e:
+                logger.error(f"❌ Erreur sauvegarde index IVF {index_path}: {e}")
+        else:
+            logger.info(f"🧭 Index IVF chargé: {index.nlist} listes")
+        
+        self._ann_state = (candidates, index)
+    
+    def get_item_neighbors(self, candidates: CandidateMatrix = None) -> Optional[ItemNeighbors]:
+        """Table des voisins précalculée (scripts/build_item_neighbors.py), None si
+        absente ou construite pour un autre ensemble d'articles recommandables"""
+        if candidates is None:
+            candidates = self.get_candidates()
+        state = self._neighbors_state
+        if state is None or state[0] is not candidates:
+            self.data_loader.loads.ensure(
+                "item_neighbors",
+                lambda: self._load_item_neighbors(candidates),
+                is_loaded=lambda: self._neighbors_state is not None and self._neighbors_state[0] is candidates
+            )
+            state = self._neighbors_state
+        return state[1]
+    
+    def _load_item_neighbors(self, candidates: CandidateMatrix):
+        from config import settings
+        
+        neighbors_path = settings.CACHE_PATH / NEIGHBORS_DIRNAME
+        neighbors = ItemNeighbors.load(neighbors_path)
+        if neighbors is None:
+            logger.warning(f"⚠️ Table des voisins absente ({neighbors_path}), scan exact utilisé")
+        elif neighbors.fingerprint != candidates.fingerprint():
+            logger.warning("⚠️ Table des voisins obsolète (articles recommandables modifiés), scan exact utilisé")
+            neighbors = None
+        else:
+            logger.info(f"🔗 Table des voisins chargée: {neighbors.neighbor_ids.shape}")
+        
+        self._neighbors_state = (candidates, neighbors)
+    
+    def retrieve_from_neighbors(self, recent_article_ids: np.ndarray, k: int,
+                                exclude_article_ids: Optional[np.ndarray] = None) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """k meilleurs candidats par fusion des listes de voisins des articles récents
+        
+        Aucun scan : seules les listes précalculées des articles sources sont lues.
+        None si la table est indisponible ou ne fournit pas k candidats non vus.
+        """
+        neighbors = self.get_item_neighbors()
+        if neighbors is None:
+            return None
+        
+        article_ids, scores = neighbors.merge(recent_article_ids)
+        if exclude_article_ids is not None and len(exclude_article_ids) > 0:
+            keep = ~np.isin(article_ids, exclude_article_ids)
+            article_ids, scores = article_ids[keep], scores[keep]
+        
+        if len(article_ids) < k:
+            return None
+        
+        best = top_k(scores, k)
+        return article_ids[best], scores[best]
+    
+    def retrieve(self, user_profile: np.ndarray, k: int, exclude_article_ids: Optional[np.ndarray] = None,
+                 method: str = None, nprobe: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """article_id et similarités des k candidats les plus proches d'un profil normalisé
+        
+        method : "exact" (scan de toute la matrice) ou "ivf" (listes les plus proches
+        seulement, nprobe listes sondées) ; par défaut CONTENT_RETRIEVAL, le mode
+        "neighbors" se rabattant ici sur le scan exact.
+        """
+        from config import settings
+        
+        method = method or settings.CONTENT_RETRIEVAL
+        candidates = self.get_candidates()
+        query = candidates.project(user_profile)
+        excluded_rows = None
+        if exclude_article_ids is not None:
+            excluded_rows = candidates.positions_of(exclude_article_ids)
+        
+        if method == "ivf":
+            # Seules les lignes des listes sondées sont évaluées
+            rows = self.get_ann_index(candidates).probe(
+                query, nprobe or settings.CONTENT_IVF_NPROBE,
+                min_candidates=k, excluded_rows=excluded_rows
+            )
+            scores = candidates.exact_vectors(rows) @ query
+        else:
+            # Similarité cosinus avec tous les candidats : un seul produit matrice-vecteur
+            # (approché en int8 puis re-classé si CONTENT_QUANTIZATION=int8)
+            rows, scores = candidates.scan(query, k, excluded_rows, rerank_size=settings.CONTENT_RERANK_SIZE)
+        
+        best = top_k(scores, k)
+        best = best[np.isfinite(scores[best])]
+        article_rows = rows[best] if rows is not None else best
+        return candidates.article_ids[article_rows], scores[best]
+    
+    def retrieve_batch(self, user_ids, k: int, exclude_seen: bool = True,
+                       block_users: int = 64) -> List[Optional[Tuple[np.ndarray, np.ndarray]]]:
+        """Top-k exact de plusieurs utilisateurs (article_id, similarités), aligné sur user_ids
+        
+        Les profils d'un bloc d'utilisateurs sont construits ensemble puis scorés par
+        un seul produit matrice-matrice contre les candidats ; les articles vus sont
+        masqués par utilisateur. None pour un utilisateur sans profil.
+        `block_users` borne la mémoire : block_users × nombre de candidats scores.
+        En mode int8, la matrice dense est matérialisée au premier appel.
+        """
+        from config import settings
+        
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        half_life = settings.PROFILE_DECAY_HALF_LIFE_HOURS
+        candidates = self.get_candidates()
+        results: List[Optional[Tuple[np.ndarray, np.ndarray]]] = [None] * len(user_ids)
+        
+        for block_start in range(0, len(user_ids), block_users):
+            block = user_ids[block_start:block_start + block_users]
+            
+            # Profils : moyenne (pondérée) des embeddings des 10 derniers articles, par utilisateur
+            recent, recent_offsets = self.data_loader.get_users_article_ids(block, limit=PROFILE_RECENT_CLICKS)
+            owners = np.repeat(np.arange(len(block)), np.diff(recent_offsets))
+            article_embeddings, valid = self.data_loader.get_article_embeddings(recent)
+            weights = None
+            if half_life > 0:
+                timestamps, _ = self.data_loader.get_users_click_timestamps(block, limit=PROFILE_RECENT_CLICKS)
+                latest = timestamps[recent_offsets[owners]]
+                weights = decay_weights(timestamps, latest, half_life)[valid].astype(np.float32)
+            owners = owners[valid]
+            counts = np.bincount(owners, minlength=len(block))
+            has_profile = counts > 0
+            if not has_profile.any():
+                continue
+            
+            group_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[has_profile]
+            if weights is None:
+                profiles = np.add.reduceat(article_embeddings, group_starts, axis=0)
+                profiles /= counts[has_profile][:, None]
+            else:
+                profiles = np.add.reduceat(article_embeddings * weights[:, None], group_starts, axis=0)
+                profiles /= np.bincount(owners, weights=weights, minlength=len(block))[has_profile][:, None]
+            norms = np.linalg.norm(profiles, axis=1, keepdims=True)
+            np.divide(profiles, norms, out=profiles, where=norms > 0)
+            
+            # GEMM pour tout le bloc d'utilisateurs (par blocs de lignes en mode quantifié)
+            scores = candidates.score_many(candidates.project(profiles))
+            profile_users = np.flatnonzero(has_profile)
+            
+            if exclude_seen:
+                seen, seen_offsets = self.data_loader.get_users_article_ids(block[profile_users])
+                seen_owners = np.repeat(np.arange(len(profile_users)), np.diff(seen_offsets))
+                seen_rows = candidates.rows_of(seen)
+                known = seen_rows >= 0
+                scores[seen_owners[known], seen_rows[known]] = -np.inf
+            
+            best = top_k_rows(scores, k)
+            best_scores = np.take_along_axis(scores, best, axis=1)
+            for position, user_best, user_scores in zip(profile_users.tolist(), best, best_scores):
+                finite = np.isfinite(user_scores)
+                results[block_start + position] = (candidates.article_ids[user_best[finite]], user_scores[finite])
+        
+        return results
+    
+    def recommend_batch(self, user_ids, n_recommendations: int = 5, **kwargs) -> Dict[int, List[Dict[str, Any]]]:
+        """Recommandations par contenu pour plusieurs utilisateurs (scan exact par GEMM)
+        
+        Les utilisateurs sans profil passent par recommend() (fallback popularité).
+        """
+        user_ids = [int(user_id) for user_id in user_ids]
+        results = self.retrieve_batch(user_ids, n_recommendations, exclude_seen=kwargs.get('exclude_seen', True))
+        
+        recommendations = {}
+        for user_id, result in zip(user_ids, results):
+            if result is None:
+                recommendations[user_id] = self.recommend(user_id, n_recommendations, **kwargs)
+                continue
+            
+            article_ids, scores = result
+            recommendations[user_id] = self._format_recommendations([
+                (article_id, similarity, f"Similaire à vos lectures (score: {similarity:.3f})")
+                for article_id, similarity in zip(article_ids.tolist(), scores.tolist())
+            ])
+        
+        logger.info(f"📖 Recommandations par contenu générées pour {len(user_ids)} utilisateurs (lot)")
+        return recommendations
+    
+    def get_profile_cache_stats(self) -> Dict:
+        """Taille, taux de succès et évictions du cache des profils"""
+        return self._profiles.stats()
+    
+    def _profile_matrix_fingerprint(self) -> str:
+        """Empreinte des paramètres des profils : embeddings, fenêtre de clics, demi-vie"""
+        from config import settings
+        
+        embeddings = self.data_loader.load_articles_embeddings()
+        key = f"{embeddings_fingerprint(embeddings)}:{PROFILE_RECENT_CLICKS}:{settings.PROFILE_DECAY_HALF_LIFE_HOURS}"
+        return hashlib.sha1(key.encode()).hexdigest()
+    
+    def build_profile_matrix(self) -> None:
+        """Précalcule le profil de tous les utilisateurs (scripts/build_user_profiles.py)"""
+        from config import settings
+        
+        # Une ligne par user_id, comme l'index CSR des interactions
+        users = self.data_loader.get_all_users()
+        user_ids = np.arange(users[-1] + 1 if users else 0)
+        article_ids, offsets = self.data_loader.get_users_article_ids(user_ids, limit=PROFILE_RECENT_CLICKS)
+        timestamps, _ = self.data_loader.get_users_click_timestamps(user_ids, limit=PROFILE_RECENT_CLICKS)
+        _, all_offsets = self.data_loader.get_users_article_ids(user_ids)
+        
+        build_profile_matrix(
+            settings.CACHE_PATH / PROFILE_MATRIX_DIRNAME, article_ids, offsets, timestamps,
+            np.diff(all_offsets), self.data_loader.load_articles_embeddings(),
+            self._profile_matrix_fingerprint(), half_life_hours=settings.PROFILE_DECAY_HALF_LIFE_HOURS
+        )
+        self._profile_matrix_state = None
+    
+    def get_profile_matrix(self) -> Optional[ProfileMatrix]:
+        """Profils précalculés, None si désactivés, absents ou calculés avec d'autres paramètres"""
+        from config import settings
+        
+        if not settings.PROFILE_MATRIX_ENABLED:
+            return None
+        state = self._profile_matrix_state
+        if state is None:
+            self.data_loader.loads.ensure(
+                "user_profiles",
+                self._load_profile_matrix,
+                is_loaded=lambda: self._profile_matrix_state is not None
+            )
+            state = self._profile_matrix_state
+        return state[0]
+    
+    def _load_profile_matrix(self):
+        from config import settings
+        
+        matrix_path = settings.CACHE_PATH / PROFILE_MATRIX_DIRNAME
+        matrix = ProfileMatrix.load(matrix_path)
+        if matrix is None:
+            logger.info(f"ℹ️ Matrice des profils absente ({matrix_path}), profils calculés à la demande")
+        elif matrix.fingerprint != self._profile_matrix_fingerprint():
+            logger.warning("⚠️ Matrice des profils obsolète (embeddings ou pondération modifiés), ignorée")
+            matrix = None
+        else:
+            logger.info(f"👤 Matrice des profils chargée: {matrix.profiles.shape}")
+        
+        self._profile_matrix_state = (matrix,)
+    
+    def _user_profile(self, user_id: int) -> np.ndarray:
+        """Profil utilisateur normalisé, mis en cache jusqu'au prochain clic de l'utilisateur
+        
+        Lu dans la matrice précalculée si l'utilisateur n'a pas cliqué depuis, sinon
+        calculé à partir de ses derniers clics.
+        """
+        version = self.data_loader.get_user_version(user_id)
+        profile = self._profiles.get(user_id, version)
+        if profile is None:
+            matrix = self.get_profile_matrix()
+            if matrix is not None:
+                profile = matrix.get(user_id, version)
+            if profile is None:
+                profile = self._compute_user_profile(user_id)
+            if profile is not None:
+                self._profiles.put(user_id, version, profile)
+        return profile
+    
+    def _compute_user_profile(self, user_id: int) -> np.ndarray:
+        """Moyenne des embeddings des 10 derniers articles, pondérée par l'ancienneté
+        des clics si PROFILE_DECAY_HALF_LIFE_HOURS > 0"""
+        from config import settings
+        
+        user_articles = self.data_loader.get_user_article_ids(user_id, limit=PROFILE_RECENT_CLICKS)
+        article_embeddings, known = self.data_loader.get_article_embeddings(user_articles)
+        
+        if not known.any():
+            return None
+        
+        if settings.PROFILE_DECAY_HALF_LIFE_HOURS > 0:
+            timestamps, _ = self.data_loader.get_users_click_timestamps([user_id], limit=PROFILE_RECENT_CLICKS)
+            weights = decay_weights(timestamps, timestamps[0], settings.PROFILE_DECAY_HALF_LIFE_HOURS)
+            profile = np.average(article_embeddings, axis=0, weights=weights[known])
+            profile = profile.astype(np.float32)
+        else:
+            profile = article_embeddings.mean(axis=0)
+        
+        norm = np.linalg.norm(profile)
+        return profile / norm if norm > 0 else profile
     
     def recommend(self, user_id: int, n_recommendations: int = 5, **kwargs) -> List[Dict[str, Any]]:
         """Recommande des articles similaires à ceux consultés par l'utilisateur"""
-        logger.info(f"📖 Recommandation par contenu pour user {user_id}")
+        from config import settings
         
-        # Récupérer l'historique utilisateur
-        user_history = self.data_loader.get_user_history(user_id, limit=10)  # 10 derniers articles
+        logger.info(f"📖 Recommandation par contenu pour user {user_id}")
         
-        if len(user_history) == 0:
+        if self.data_loader.get_user_interaction_count(user_id) == 0:
             logger.warning(f"⚠️ Aucun historique pour user {user_id}, fallback sur popularité")
             # Fallback sur popularité pour nouveaux utilisateurs
             from .popularity import PopularityRecommender
             fallback = PopularityRecommender(self.data_loader)
             return fallback.recommend(user_id, n_recommendations, **kwargs)
         
-        # Charger les embeddings et métadonnées
-        embeddings = self.data_loader.load_articles_embeddings()
-        metadata = self.data_loader.load_articles_metadata()
-        available_articles = self._get_available_articles(user_id, kwargs.get('exclude_seen', True))
-        
-        if len(available_articles) == 0:
-            logger.warning(f"⚠️ Aucun article disponible pour user {user_id}")
-            return []
-        
-        # Calculer le profil utilisateur (moyenne des embeddings des articles vus)
-        user_articles = user_history['click_article_id'].tolist()
-        user_embeddings = []
-        
-        for article_id in user_articles:
-            if article_id < len(embeddings):  # Vérifier que l'ID est valide
-                user_embeddings.append(embeddings[article_id])
-        
-        if len(user_embeddings) == 0:
+        # Profil utilisateur (moyenne des embeddings des articles vus)
+        user_profile = self._user_profile(user_id)
+        if user_profile is None:
             logger.warning(f"⚠️ Aucun embedding trouvé pour les articles de user {user_id}")
             return []
         
-        # Profil utilisateur = moyenne des embeddings
-        user_profile = np.mean(user_embeddings, axis=0).reshape(1, -1)
+        seen_articles = None
+        if kwargs.get('exclude_seen', True):
+            seen_articles = self.data_loader.get_user_article_ids(user_id)
         
-        # Calculer similarités avec tous les articles disponibles (vectorisé)
-        article_ids = available_articles['article_id'].tolist()
-        category_ids = available_articles['category_id'].tolist()
-
-        # Filtrer les IDs valides et préparer les embeddings
-        valid_data = []
-        article_embeddings_list = []
-
-        for i, article_id in enumerate(article_ids):
-            if article_id < len(embeddings):
-                valid_data.append({
-                    'article_id': article_id,
-                    'category_id': category_ids[i]
-                })
-                article_embeddings_list.append(embeddings[article_id])
-
-        if len(article_embeddings_list) == 0:
-            logger.warning(f"⚠️ Aucun embedding valide trouvé pour les articles disponibles")
+        result = None
+        if settings.CONTENT_RETRIEVAL == "neighbors":
+            result = self.retrieve_from_neighbors(
+                self.data_loader.get_user_article_ids(user_id, limit=PROFILE_RECENT_CLICKS), n_recommendations,
+                exclude_article_ids=seen_articles
+            )
+        if result is None:
+            result = self.retrieve(user_profile, n_recommendations, exclude_article_ids=seen_articles)
+        article_ids, scores = result
+        
+        if len(article_ids) == 0:
+            logger.warning(f"⚠️ Aucun article disponible pour user {user_id}")
             return []
-
-        # Calcul vectorisé des similarités
-        article_embeddings_matrix = np.array(article_embeddings_list)
-        similarities_scores = cosine_similarity(user_profile, article_embeddings_matrix)[0]
-
-        # Créer la liste des similarités
-        similarities = []
-        for i, data in enumerate(valid_data):
-            similarities.append({
-                'article_id': data['article_id'],
-                'similarity': similarities_scores[i],
-                'category_id': data['category_id']
-            })
-        
-        # Trier par similarité
-        similarities.sort(key=lambda x: x['similarity'], reverse=True)
         
         # Générer les recommandations
-        recommendations = []
-        for i, item in enumerate(similarities[:n_recommendations]):
-            reason = f"Similaire à vos lectures (score: {item['similarity']:.3f})"
-            
-            recommendations.append(self._format_recommendation(
-                article_id=item['article_id'],
-                score=item['similarity'],
-                reason=reason
-            ))
+        candidates_list = []
+        for article_id, similarity in zip(article_ids.tolist(), scores.tolist()):
+            reason = f"Similaire à vos lectures (score: {similarity:.3f})"
+            candidates_list.append((article_id, similarity, reason))
+        
+        recommendations = self._format_recommendations(candidates_list)
         
         logger.info(f"📖 {len(recommendations)} recommandations par contenu générées")
-        return recommendations
\ No newline at end of file
+        return recommendations
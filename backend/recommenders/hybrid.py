@@ -13,11 +13,11 @@ logger = logging.getLogger(__name__)
 class HybridRecommender(BaseRecommender):
     """Recommandeur hybride combinant plusieurs approches"""
     
-    def __init__(self, data_loader):
+    def __init__(self, data_loader, popularity_rec=None, content_rec=None, clustering_rec=None):
         super().__init__(data_loader)
-        self.popularity_rec = PopularityRecommender(data_loader)
-        self.content_rec = ContentRecommender(data_loader)
-        self.clustering_rec = ClusteringRecommender(data_loader)
+        self.popularity_rec = popularity_rec or PopularityRecommender(data_loader)
+        self.content_rec = content_rec or ContentRecommender(data_loader)
+        self.clustering_rec = clustering_rec or ClusteringRecommender(data_loader)
     
     def recommend(self, user_id: int, n_recommendations: int = 5, **kwargs) -> List[Dict[str, Any]]:
         """Combine les recommandations de plusieurs approches"""
@@ -103,25 +103,16 @@ class HybridRecommender(BaseRecommender):
         
         # 4. Diversité (10%) - Bonus pour articles de catégories différentes
         try:
-            user_history = self.data_loader.get_user_history(user_id, limit=20)
-            if len(user_history) > 0:
-                metadata = self.data_loader.load_articles_metadata()
-                user_articles_with_cats = user_history.merge(
-                    metadata[['article_id', 'category_id']], 
-                    left_on='click_article_id', 
-                    right_on='article_id', 
-                    how='left'
-                )
+            user_articles = self.data_loader.get_user_article_ids(user_id, limit=20)
+            if len(user_articles) > 0:
+                user_categories = set(self.data_loader.get_article_categories(user_articles).tolist())
                 
-                if len(user_articles_with_cats) > 0:
-                    user_categories = set(user_articles_with_cats['category_id'].dropna().tolist())
-                    
-                    # Bonus pour articles de nouvelles catégories
-                    for article_id, rec_data in all_recommendations.items():
-                        article_info = rec_data['metadata']
-                        if article_info.get('category_id') not in user_categories:
-                            all_recommendations[article_id]['scores']['diversity'] = 1.0
-                            all_recommendations[article_id]['reasons'].append("Diversité: Nouvelle catégorie")
+                # Bonus pour articles de nouvelles catégories
+                for article_id, rec_data in all_recommendations.items():
+                    article_info = rec_data['metadata']
+                    if article_info.get('category_id') not in user_categories:
+                        all_recommendations[article_id]['scores']['diversity'] = 1.0
+                        all_recommendations[article_id]['reasons'].append("Diversité: Nouvelle catégorie")
         except Exception as e:
             logger.error(f"❌ Erreur diversité: {e}")
         
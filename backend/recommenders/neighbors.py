@@ -0,0 +1,158 @@
+# backend/recommenders/neighbors.py
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Tuple
+import logging
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+logger = logging.getLogger(__name__)
+
+NEIGHBORS_DIRNAME = "item_neighbors"
+
+_VECTORS_FILE = "vectors.tmp.npy"
+_ARTICLES_FILE = "articles.npy"
+_IDS_FILE = "neighbor_ids.npy"
+_SCORES_FILE = "neighbor_scores.npy"
+_META_FILE = "meta.json"
+
+
+def _neighbors_block(task: Tuple[str, int, int, int]) -> int:
+    """Top-k voisins des lignes [start, end) : un produit matriciel par bloc
+
+    Exécuté dans un processus du pool : la matrice normalisée est ouverte en
+    mmap (partagée via le cache de pages) et le résultat écrit directement dans
+    les tables de sortie, sur des lignes disjointes.
+    """
+    directory, start, end, k = task
+    directory = Path(directory)
+    vectors = np.load(directory / _VECTORS_FILE, mmap_mode='r')
+    neighbor_ids = np.load(directory / _IDS_FILE, mmap_mode='r+')
+    neighbor_scores = np.load(directory / _SCORES_FILE, mmap_mode='r+')
+
+    # Distances négatives calculées en place : un seul bloc (end - start) × n en mémoire
+    distances = np.asarray(vectors[start:end]) @ np.asarray(vectors).T
+    np.negative(distances, out=distances)
+    # Un article n'est pas son propre voisin
+    distances[np.arange(end - start), np.arange(start, end)] = np.inf
+
+    best = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    best_distances = np.take_along_axis(distances, best, axis=1)
+    order = np.argsort(best_distances, axis=1, kind='stable')
+
+    neighbor_ids[start:end] = np.take_along_axis(best, order, axis=1)
+    neighbor_scores[start:end] = -np.take_along_axis(best_distances, order, axis=1)
+    neighbor_ids.flush()
+    neighbor_scores.flush()
+    return end - start
+
+
+def build_neighbor_table(directory: Path, article_ids: np.ndarray, vectors: np.ndarray, fingerprint: str,
+                         k: int = 50, block_rows: int = 64, workers: int = 1) -> None:
+    """Calcule les k plus proches voisins de chaque article et publie la table
+
+    `vectors` : embeddings L2-normalisés alignés sur `article_ids`. La table est
+    construite dans un répertoire temporaire puis substituée à l'ancienne.
+    """
+    from clicks_store import resolve_workers
+
+    k = min(k, len(article_ids) - 1)
+    tmp_directory = directory.with_name(f"{directory.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_directory, ignore_errors=True)
+    tmp_directory.mkdir(parents=True)
+
+    np.save(tmp_directory / _VECTORS_FILE, np.ascontiguousarray(vectors, dtype=np.float32))
+    np.save(tmp_directory / _ARTICLES_FILE, np.asarray(article_ids, dtype=np.int32))
+    # Lignes de la matrice d'abord, converties en article_id à la fin
+    open_memmap(tmp_directory / _IDS_FILE, mode='w+', dtype=np.int32, shape=(len(article_ids), k)).flush()
+    open_memmap(tmp_directory / _SCORES_FILE, mode='w+', dtype=np.float32, shape=(len(article_ids), k)).flush()
+
+    tasks = [
+        (str(tmp_directory), start, min(start + block_rows, len(article_ids)), k)
+        for start in range(0, len(article_ids), block_rows)
+    ]
+    workers = min(resolve_workers(workers), len(tasks))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for done, _ in enumerate(executor.map(_neighbors_block, tasks), start=1):
+                if done % 100 == 0:
+                    logger.info(f"⚙️ Voisins: {done}/{len(tasks)} blocs")
+    else:
+        for task in tasks:
+            _neighbors_block(task)
+
+    neighbor_rows = np.load(tmp_directory / _IDS_FILE, mmap_mode='r+')
+    neighbor_rows[:] = np.asarray(article_ids, dtype=np.int32)[neighbor_rows]
+    neighbor_rows.flush()
+    del neighbor_rows
+    os.remove(tmp_directory / _VECTORS_FILE)
+
+    with open(tmp_directory / _META_FILE, 'w') as f:
+        json.dump({"fingerprint": fingerprint, "k": k, "articles": len(article_ids)}, f)
+
+    # Substitution : les lecteurs voient l'ancienne ou la nouvelle table, jamais un mélange
+    old_directory = directory.with_name(f"{directory.name}.{os.getpid()}.old")
+    if directory.exists():
+        os.replace(directory, old_directory)
+    os.replace(tmp_directory, directory)
+    shutil.rmtree(old_directory, ignore_errors=True)
+
+    logger.info(f"💾 Table des voisins écrite: {directory} ({len(article_ids):,} articles × {k} voisins, "
+                f"{workers} processus)")
+
+
+class ItemNeighbors:
+    """Table des k articles les plus similaires à chaque article, mappée en mémoire
+
+    La ligne i donne les voisins de articles[i], triés par similarité décroissante.
+    """
+
+    def __init__(self, articles: np.ndarray, neighbor_ids: np.ndarray, neighbor_scores: np.ndarray,
+                 fingerprint: str):
+        self.articles = articles
+        self.neighbor_ids = neighbor_ids
+        self.neighbor_scores = neighbor_scores
+        self.fingerprint = fingerprint
+        size = int(articles.max()) + 1 if len(articles) > 0 else 0
+        self.rows = np.full(size, -1, dtype=np.int32)
+        self.rows[articles] = np.arange(len(articles), dtype=np.int32)
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional['ItemNeighbors']:
+        """Ouvre la table en mmap, None si absente ou illisible"""
+        if not (directory / _META_FILE).exists():
+            return None
+        try:
+            with open(directory / _META_FILE) as f:
+                meta = json.load(f)
+            return cls(
+                np.load(directory / _ARTICLES_FILE),
+                np.asarray(np.load(directory / _IDS_FILE, mmap_mode='r')),
+                np.asarray(np.load(directory / _SCORES_FILE, mmap_mode='r')),
+                meta["fingerprint"]
+            )
+        except Exception as e:
+            logger.error(f"❌ Erreur lecture table des voisins {directory}: {e}")
+            return None
+
+    def merge(self, article_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Fusionne les listes de voisins de plusieurs articles
+
+        Score d'un candidat = somme de ses similarités aux articles sources présents
+        dans la table, divisée par leur nombre (similarité moyenne, 0 hors liste) :
+        approximation du score contre le profil moyen, sans scan.
+        """
+        article_ids = np.asarray(article_ids, dtype=np.int64)
+        article_ids = article_ids[(article_ids >= 0) & (article_ids < len(self.rows))]
+        rows = self.rows[article_ids]
+        rows = rows[rows >= 0]
+        if len(rows) == 0:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+
+        candidates, inverse = np.unique(self.neighbor_ids[rows].ravel(), return_inverse=True)
+        scores = np.bincount(inverse, weights=self.neighbor_scores[rows].ravel(), minlength=len(candidates))
+        return candidates, (scores / len(rows)).astype(np.float32)
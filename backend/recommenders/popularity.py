@@ -9,16 +9,11 @@ logger = logging.getLogger(__name__)
 class PopularityRecommender(BaseRecommender):
     """Recommandeur basé sur la popularité récente"""
     
-    def __init__(self, data_loader):
-        super().__init__(data_loader)
-        self._popular_articles_cache = None
-        self._cache_timestamp = None
-    
     def recommend(self, user_id: int, n_recommendations: int = 5, **kwargs) -> List[Dict[str, Any]]:
         """Recommande les articles les plus populaires récemment"""
         logger.info(f"🔥 Recommandation par popularité pour user {user_id}")
         
-        # Récupérer les articles populaires
+        # Récupérer les articles populaires (classement matérialisé par le DataLoader)
         popular_articles = self.data_loader.get_recent_popular_articles()
         
         if len(popular_articles) == 0:
@@ -35,16 +30,13 @@ class PopularityRecommender(BaseRecommender):
             available_articles = popular_articles
         
         # Prendre le top N
-        recommendations = []
+        candidates = []
         for i, (article_id, row) in enumerate(available_articles.head(n_recommendations).iterrows()):
             score = row['popularity_score']
             reason = f"Article populaire (#{i+1}) - {row['unique_users']} utilisateurs, {row['total_clicks']} clics"
-            
-            recommendations.append(self._format_recommendation(
-                article_id=article_id,
-                score=score,
-                reason=reason
-            ))
+            candidates.append((article_id, score, reason))
+        
+        recommendations = self._format_recommendations(candidates)
         
         logger.info(f"🔥 {len(recommendations)} recommandations par popularité générées")
         return recommendations
\ No newline at end of file
@@ -0,0 +1,194 @@
+# backend/recommenders/profiles.py
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Hashable, Optional
+import logging
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MATRIX_DIRNAME = "user_profiles"
+
+_PROFILES_FILE = "profiles.npy"
+_COUNTS_FILE = "click_counts.npy"
+_LATEST_FILE = "latest_clicks.npy"
+_META_FILE = "meta.json"
+
+
+def decay_weights(timestamps: np.ndarray, latest: np.ndarray, half_life_hours: float) -> np.ndarray:
+    """Poids exponentiels des clics : 1 pour le plus récent de l'utilisateur,
+    divisé par deux tous les `half_life_hours` avant lui
+
+    La référence est le dernier clic de l'utilisateur (et non l'heure courante) :
+    un profil reste valide tant que l'utilisateur n'a pas de nouveau clic.
+    """
+    age_hours = (np.asarray(latest, dtype=np.float64) - timestamps) / 3_600_000
+    return np.exp2(-age_hours / half_life_hours)
+
+
+class ProfileCache:
+    """Cache LRU borné des profils utilisateurs (vecteurs normalisés)
+
+    Chaque entrée porte la version de l'historique de l'utilisateur (nombre de
+    clics, dernier clic) : une entrée dont la version diffère est invalidée à la
+    lecture, sans toucher aux profils des autres utilisateurs.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int, version: Hashable) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] != version:
+                del self._entries[user_id]
+                self.invalidations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id: int, version: Hashable, profile: np.ndarray):
+        if self.capacity <= 0:
+            return
+        # Partagé entre requêtes : lecture seule
+        profile.flags.writeable = False
+        with self._lock:
+            self._entries[user_id] = (version, profile)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups > 0 else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+
+def build_profile_matrix(directory: Path, article_ids: np.ndarray, offsets: np.ndarray, timestamps: np.ndarray,
+                         click_counts: np.ndarray, embeddings: np.ndarray, fingerprint: str,
+                         half_life_hours: float = 0.0, block_users: int = 65536) -> None:
+    """Profils de tous les utilisateurs en une passe : matrice creuse utilisateurs ×
+    articles (poids des derniers clics) multipliée par la matrice des embeddings
+
+    `article_ids`, `timestamps` : derniers clics de chaque utilisateur (u = 0..n-1),
+    ceux de u étant aux positions offsets[u]:offsets[u + 1], du plus récent au plus
+    ancien. `click_counts` : nombre total de clics par utilisateur (version du
+    profil avec le dernier clic). La ligne u du résultat est le profil normalisé de
+    u, nulle s'il n'a aucun article connu. Écrit dans un répertoire temporaire puis
+    substitué à l'ancien.
+    """
+    from scipy import sparse
+
+    n_users = len(offsets) - 1
+    lengths = np.diff(offsets)
+    owners = np.repeat(np.arange(n_users), lengths)
+    if half_life_hours > 0:
+        weights = decay_weights(timestamps, timestamps[offsets[:-1][owners]], half_life_hours)
+    else:
+        weights = np.ones(len(article_ids))
+    known = (article_ids >= 0) & (article_ids < len(embeddings))
+
+    # Les clics en double sur un article s'additionnent, comme dans la moyenne
+    clicks = sparse.csr_matrix(
+        (weights[known].astype(np.float32), (owners[known], article_ids[known])),
+        shape=(n_users, len(embeddings))
+    )
+
+    tmp_directory = directory.with_name(f"{directory.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_directory, ignore_errors=True)
+    tmp_directory.mkdir(parents=True)
+
+    profiles = open_memmap(tmp_directory / _PROFILES_FILE, mode='w+', dtype=np.float32,
+                           shape=(n_users, embeddings.shape[1]))
+    for start in range(0, n_users, block_users):
+        block = np.asarray(clicks[start:start + block_users] @ embeddings, dtype=np.float32)
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        np.divide(block, norms, out=block, where=norms > 0)
+        profiles[start:start + len(block)] = block
+    profiles.flush()
+    del profiles
+
+    latest = np.zeros(n_users, dtype=np.int64)
+    latest[lengths > 0] = timestamps[offsets[:-1][lengths > 0]]
+    np.save(tmp_directory / _COUNTS_FILE, np.asarray(click_counts, dtype=np.int64))
+    np.save(tmp_directory / _LATEST_FILE, latest)
+    with open(tmp_directory / _META_FILE, 'w') as f:
+        json.dump({"fingerprint": fingerprint, "users": n_users}, f)
+
+    old_directory = directory.with_name(f"{directory.name}.{os.getpid()}.old")
+    if directory.exists():
+        os.replace(directory, old_directory)
+    os.replace(tmp_directory, directory)
+    shutil.rmtree(old_directory, ignore_errors=True)
+
+    logger.info(f"💾 Matrice des profils écrite: {directory} ({n_users:,} utilisateurs, {clicks.nnz:,} clics)")
+
+
+class ProfileMatrix:
+    """Profils précalculés (build_profile_matrix), mappés en mémoire, ligne = user_id
+
+    Une ligne n'est servie que si la version de l'utilisateur (nombre de clics,
+    dernier clic) n'a pas changé depuis le calcul.
+    """
+
+    def __init__(self, profiles: np.ndarray, click_counts: np.ndarray, latest_clicks: np.ndarray, fingerprint: str):
+        self.profiles = profiles
+        self.click_counts = click_counts
+        self.latest_clicks = latest_clicks
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional['ProfileMatrix']:
+        """Ouvre la matrice en mmap, None si absente ou illisible"""
+        if not (directory / _META_FILE).exists():
+            return None
+        try:
+            with open(directory / _META_FILE) as f:
+                meta = json.load(f)
+            return cls(
+                np.asarray(np.load(directory / _PROFILES_FILE, mmap_mode='r')),
+                np.load(directory / _COUNTS_FILE),
+                np.load(directory / _LATEST_FILE),
+                meta["fingerprint"]
+            )
+        except Exception as e:
+            logger.error(f"❌ Erreur lecture matrice des profils {directory}: {e}")
+            return None
+
+    def get(self, user_id: int, version: Hashable) -> Optional[np.ndarray]:
+        """Profil précalculé de l'utilisateur, None s'il est absent ou périmé"""
+        if user_id < 0 or user_id >= len(self.click_counts):
+            return None
+        if (int(self.click_counts[user_id]), int(self.latest_clicks[user_id])) != tuple(version):
+            return None
+        profile = self.profiles[user_id]
+        return profile if profile.any() else None
@@ -0,0 +1,111 @@
+# backend/recommenders/projection.py
+import os
+from pathlib import Path
+from typing import Optional
+import logging
+
+import numpy as np
+
+from .ann import fingerprint, fingerprint_rows
+
+logger = logging.getLogger(__name__)
+
+PROJECTION_FILENAME = "content_projection.npz"
+
+
+class Projection:
+    """Projection linéaire des embeddings vers `dim` dimensions : x ↦ x · components
+
+    "pca" : axes principaux (SVD non centrée, qui préserve au mieux les produits
+    scalaires) ajustés sur un échantillon d'articles ; "random" : projection
+    gaussienne (Johnson-Lindenstrauss), sans apprentissage. Sans centrage, le
+    profil projeté d'un utilisateur reste la moyenne de ses articles projetés.
+    """
+
+    def __init__(self, method: str, components: np.ndarray, fingerprint: str, retained: float = float('nan')):
+        self.method = method
+        self.components = components
+        self.fingerprint = fingerprint
+        # Part de l'énergie des embeddings conservée (PCA uniquement)
+        self.retained = retained
+
+    @property
+    def dim(self) -> int:
+        return self.components.shape[1]
+
+    @classmethod
+    def fit(cls, vectors: np.ndarray, dim: int, method: str = "pca", fingerprint: str = "",
+            sample_size: int = 100_000, seed: int = 42) -> 'Projection':
+        """Ajuste la projection sur les embeddings (lignes échantillonnées)"""
+        dim = min(dim, vectors.shape[1])
+        rng = np.random.default_rng(seed)
+
+        if method == "random":
+            components = rng.standard_normal((vectors.shape[1], dim)) / np.sqrt(dim)
+            return cls(method, components.astype(np.float32), fingerprint)
+
+        if method != "pca":
+            raise ValueError(f"Projection inconnue: {method}")
+
+        rows = np.sort(rng.choice(len(vectors), size=min(sample_size, len(vectors)), replace=False))
+        sample = np.asarray(vectors[rows], dtype=np.float64)
+        eigenvalues, eigenvectors = np.linalg.eigh(sample.T @ sample)
+        # eigh trie par valeur propre croissante
+        components = eigenvectors[:, ::-1][:, :dim]
+        retained = float(eigenvalues[::-1][:dim].sum() / max(eigenvalues.sum(), 1e-12))
+        logger.info(f"🧮 PCA ajustée: {vectors.shape[1]} → {dim} dimensions ({retained:.1%} de l'énergie)")
+        return cls(method, components.astype(np.float32), fingerprint, retained)
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        """Vecteur(s) projeté(s), en float32"""
+        return np.asarray(vectors, dtype=np.float32) @ self.components
+
+    def save(self, path: Path):
+        """Écriture atomique de la projection"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, components=self.components, method=np.array(self.method),
+                     fingerprint=np.array(self.fingerprint), retained=np.array(self.retained))
+        os.replace(tmp_path, path)
+        logger.info(f"💾 Projection sauvegardée: {path}")
+
+    @classmethod
+    def load(cls, path: Path, fingerprint: str, method: str, dim: int) -> Optional['Projection']:
+        """Charge la projection si elle correspond aux embeddings, à la méthode et à la dimension"""
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                projection = cls(str(data['method']), data['components'], str(data['fingerprint']),
+                                 float(data['retained']))
+        except Exception as e:
+            logger.error(f"❌ Erreur lecture projection {path}: {e}")
+            return None
+
+        if projection.fingerprint != fingerprint or projection.method != method or projection.dim != dim:
+            logger.info("🔄 Projection obsolète (embeddings, méthode ou dimension modifiés)")
+            return None
+        return projection
+
+
+def embeddings_fingerprint(embeddings: np.ndarray) -> str:
+    """Empreinte de la matrice d'embeddings complète (lignes échantillonnées)"""
+    return fingerprint(np.arange(len(embeddings)), embeddings.shape[1], embeddings[fingerprint_rows(len(embeddings))])
+
+
+def load_or_fit(path: Path, embeddings: np.ndarray, method: str, dim: int, refit: bool = False) -> Projection:
+    """Projection persistée dans `path`, ajustée et sauvegardée si absente ou obsolète"""
+    dim = min(dim, embeddings.shape[1])
+    embeddings_digest = embeddings_fingerprint(embeddings)
+    projection = None if refit else Projection.load(path, embeddings_digest, method, dim)
+    if projection is not None:
+        logger.info(f"🧮 Projection chargée: {method}, {embeddings.shape[1]} → {dim} dimensions")
+        return projection
+
+    projection = Projection.fit(embeddings, dim, method, fingerprint=embeddings_digest)
+    try:
+        projection.save(path)
+    except Exception as e:
+        logger.error(f"❌ Erreur sauvegarde projection {path}: {e}")
+    return projection
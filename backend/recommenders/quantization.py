@@ -0,0 +1,51 @@
+# backend/recommenders/quantization.py
+import numpy as np
+
+# Lignes converties par bloc : le tampon float32 (~1 Mo) reste dans le cache L2
+_BLOCK_ROWS = 1024
+
+
+class Int8Matrix:
+    """Vecteurs quantifiés en int8, avec une échelle symétrique par ligne
+
+    v ≈ codes * scale, scale = max(|v|) / 127 : 4 fois moins de mémoire que
+    float32. Les scores obtenus sont approchés et servent à présélectionner une
+    courte liste, re-classée ensuite en pleine précision.
+    """
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray):
+        self.codes = codes
+        self.scales = scales
+
+    @classmethod
+    def empty(cls, n_rows: int, dim: int) -> 'Int8Matrix':
+        return cls(np.zeros((n_rows, dim), dtype=np.int8), np.zeros(n_rows, dtype=np.float32))
+
+    @classmethod
+    def quantize(cls, vectors: np.ndarray) -> 'Int8Matrix':
+        scales = (np.abs(vectors).max(axis=1) / 127).astype(np.float32)
+        safe_scales = np.where(scales > 0, scales, 1)
+        return cls(np.rint(vectors / safe_scales[:, None]).astype(np.int8), scales)
+
+    def assign(self, rows, vectors: np.ndarray):
+        """Quantifie des vecteurs dans les lignes `rows` (indices ou slice)"""
+        quantized = self.quantize(vectors)
+        self.codes[rows] = quantized.codes
+        self.scales[rows] = quantized.scales
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes
+
+    def dot(self, query: np.ndarray) -> np.ndarray:
+        """Produits scalaires approchés de toutes les lignes avec `query`"""
+        n_rows, dim = self.codes.shape
+        scores = np.empty(n_rows, dtype=np.float32)
+        buffer = np.empty((_BLOCK_ROWS, dim), dtype=np.float32)
+        for start in range(0, n_rows, _BLOCK_ROWS):
+            block = self.codes[start:start + _BLOCK_ROWS]
+            converted = buffer[:len(block)]
+            converted[...] = block
+            np.dot(converted, query, out=scores[start:start + len(block)])
+        scores *= self.scales
+        return scores
@@ -0,0 +1,104 @@
+# backend/scripts/benchmark_clustering.py
+"""Benchmark de la construction des features de clustering : implémentation
+vectorisée comparée à l'ancienne (jointure, groupby avec lambda, une passe par
+catégorie), et vérification que les deux matrices sont identiques
+
+Usage (depuis backend/) :
+    python3 scripts/benchmark_clustering.py --repeat 3
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loader import data_loader
+from recommenders import ClusteringRecommender
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def legacy_user_features(interactions: pd.DataFrame, metadata: pd.DataFrame) -> pd.DataFrame:
+    """Ancienne construction des features (référence)"""
+    merged = interactions.merge(
+        metadata[['article_id', 'category_id', 'words_count']],
+        left_on='click_article_id',
+        right_on='article_id',
+        how='left'
+    )
+
+    user_features = merged.groupby('user_id').agg({
+        'click_article_id': ['count', 'nunique'],
+        'category_id': lambda x: x.nunique(),
+        'words_count': ['mean', 'std'],
+        'click_timestamp': ['min', 'max']
+    }).fillna(0)
+
+    user_features.columns = [
+        'total_clicks', 'unique_articles', 'category_diversity',
+        'avg_words', 'std_words', 'first_interaction', 'last_interaction'
+    ]
+
+    user_features['activity_span_hours'] = (
+        user_features['last_interaction'] - user_features['first_interaction']
+    ) / (1000 * 3600)
+
+    user_features['clicks_per_hour'] = user_features['total_clicks'] / (
+        user_features['activity_span_hours'] + 1
+    )
+
+    top_categories = merged['category_id'].value_counts().head(10).index
+
+    for cat_id in top_categories:
+        cat_clicks = merged[merged['category_id'] == cat_id].groupby('user_id')['click_article_id'].count()
+        user_features[f'cat_{cat_id}_clicks'] = cat_clicks.fillna(0)
+        user_features[f'cat_{cat_id}_ratio'] = user_features[f'cat_{cat_id}_clicks'] / user_features['total_clicks']
+
+    user_features = user_features.fillna(0)
+    user_features = user_features.replace([np.inf, -np.inf], 0)
+    return user_features
+
+
+def _best_of(function, repeat):
+    """Meilleur temps (s) sur `repeat` exécutions, et dernier résultat"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="Exécutions par implémentation (meilleur temps)")
+    args = parser.parse_args()
+
+    interactions = data_loader.load_user_interactions()
+    metadata = data_loader.load_articles_metadata()
+    data_loader.get_article_store()
+    recommender = ClusteringRecommender(data_loader)
+    print(f"📊 {len(interactions):,} clics, {interactions['user_id'].nunique():,} utilisateurs")
+
+    legacy, legacy_time = _best_of(lambda: legacy_user_features(interactions, metadata), args.repeat)
+    vectorized, vectorized_time = _best_of(recommender._build_user_features, args.repeat)
+
+    same_shape = legacy.shape == vectorized.shape and np.array_equal(legacy.index, vectorized.index)
+    max_error = np.abs(legacy.to_numpy(dtype=np.float64) - vectorized.to_numpy(dtype=np.float64)).max() if same_shape else float('nan')
+
+    print(f"{'implémentation':<14} {'temps s':>9}")
+    print(f"{'ancienne':<14} {legacy_time:>9.2f}")
+    print(f"{'vectorisée':<14} {vectorized_time:>9.2f}")
+    print(f"🚀 Accélération: x{legacy_time / vectorized_time:.1f}")
+    print(f"✅ Matrices identiques (écart max {max_error:.2e})" if same_shape and max_error < 1e-6
+          else f"❌ Matrices différentes (formes {legacy.shape} / {vectorized.shape}, écart max {max_error:.2e})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# backend/scripts/benchmark_content.py
+"""Benchmark de la recherche par contenu : rappel@k et latence de l'index IVF
+et du scan int8 re-classé, comparés au scan exact float32
+
+Usage (depuis backend/) :
+    python3 scripts/benchmark_content.py --users 500 --k 10 --nprobe 4 8 16 32 64 --rerank 50 200 1000
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from data_loader import data_loader
+from recommenders import ContentRecommender
+from recommenders.content import CandidateMatrix, top_k
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def _timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def _print_row(method, nprobe, recall, latencies):
+    print(f"{method:<8} {nprobe:>7} {recall:>10.3f} {np.mean(latencies):>12.2f} {np.percentile(latencies, 95):>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200, help="Utilisateurs tirés au hasard")
+    parser.add_argument("--k", type=int, default=10, help="Taille du top-k évalué")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32, 64], help="Valeurs de nprobe testées")
+    parser.add_argument("--rerank", type=int, nargs="+", default=[50, 200, 1000],
+                        help="Tailles de la courte liste re-classée après le scan int8")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    recommender = ContentRecommender(data_loader)
+    candidates, elapsed = _timed(recommender.get_candidates)
+    print(f"📐 Candidats: {candidates.vectors.shape}, {candidates.nbytes / 1024 ** 2:.0f} Mo ({elapsed / 1000:.1f}s)")
+    quantized, elapsed = _timed(
+        CandidateMatrix.build, candidates.source, data_loader.load_articles_embeddings(), "int8"
+    )
+    print(f"🗜️ Candidats int8: {quantized.nbytes / 1024 ** 2:.0f} Mo ({elapsed / 1000:.1f}s)")
+    index, elapsed = _timed(recommender.get_ann_index, candidates)
+    print(f"🧭 Index IVF: {index.nlist} listes ({elapsed / 1000:.1f}s)")
+
+    rng = np.random.default_rng(args.seed)
+    all_users = np.asarray(data_loader.get_all_users())
+    users = rng.choice(all_users, size=min(args.users, len(all_users)), replace=False)
+
+    queries = []
+    for user_id in users.tolist():
+        profile = recommender._user_profile(user_id)
+        if profile is not None:
+            queries.append((profile, data_loader.get_user_article_ids(user_id)))
+
+    # Référence : scan exact
+    exact_results = []
+    latencies = []
+    for profile, seen in queries:
+        (article_ids, _), elapsed = _timed(recommender.retrieve, profile, args.k, seen, method="exact")
+        exact_results.append(set(article_ids.tolist()))
+        latencies.append(elapsed)
+
+    print(f"\n{len(queries)} requêtes, k={args.k}")
+    print(f"{'méthode':<8} {'nprobe':>7} {'rappel@k':>10} {'moyenne ms':>12} {'p95 ms':>10}")
+    _print_row("exact", "-", 1.0, latencies)
+
+    # Scan exact par lots : un GEMM par bloc d'utilisateurs (latence ramenée à l'utilisateur)
+    scored_users = [user_id for user_id in users.tolist() if recommender._user_profile(user_id) is not None]
+    batch_results, elapsed = _timed(recommender.retrieve_batch, scored_users, args.k)
+    recalls = [
+        len(expected & set(article_ids.tolist())) / max(len(expected), 1)
+        for expected, (article_ids, _) in zip(exact_results, batch_results)
+    ]
+    _print_row("batch", "-", np.mean(recalls), [elapsed / max(len(scored_users), 1)])
+
+    for nprobe in args.nprobe:
+        recalls = []
+        latencies = []
+        for (profile, seen), expected in zip(queries, exact_results):
+            (article_ids, _), elapsed = _timed(
+                recommender.retrieve, profile, args.k, seen, method="ivf", nprobe=nprobe
+            )
+            recalls.append(len(expected & set(article_ids.tolist())) / max(len(expected), 1))
+            latencies.append(elapsed)
+        _print_row("ivf", nprobe, np.mean(recalls), latencies)
+
+    # Scan int8 puis re-classement exact des `rerank` meilleurs (colonne nprobe = rerank)
+    for rerank in args.rerank:
+        recalls = []
+        latencies = []
+        for (profile, seen), expected in zip(queries, exact_results):
+            start = time.perf_counter()
+            rows, scores = quantized.scan(profile.astype(np.float32), args.k, quantized.positions_of(seen), rerank)
+            best = top_k(scores, args.k)
+            article_ids = quantized.article_ids[rows[best[np.isfinite(scores[best])]]]
+            latencies.append((time.perf_counter() - start) * 1000)
+            recalls.append(len(expected & set(article_ids.tolist())) / max(len(expected), 1))
+        _print_row("int8", rerank, np.mean(recalls), latencies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# backend/scripts/benchmark_projection.py
+"""Benchmark du scoring en dimension réduite : recouvrement du top-k, latence et
+mémoire des candidats projetés, comparés au scan exact en 250 dimensions
+
+Usage (depuis backend/) :
+    python3 scripts/benchmark_projection.py --users 500 --k 10 --dims 32 64 128 --methods pca random
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from data_loader import data_loader
+from recommenders import ContentRecommender
+from recommenders.content import CandidateMatrix, top_k
+from recommenders.projection import Projection
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def _evaluate(candidates, queries, k):
+    """Top-k (article_id) et latence (ms) du scan exact de chaque requête"""
+    results = []
+    latencies = []
+    for profile, seen in queries:
+        start = time.perf_counter()
+        scores = candidates.vectors @ candidates.project(profile)
+        scores[candidates.positions_of(seen)] = -np.inf
+        best = top_k(scores, k)
+        best = best[np.isfinite(scores[best])]
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(set(candidates.article_ids[best].tolist()))
+    return results, latencies
+
+
+def _print_row(method, dim, memory, overlap, latencies):
+    print(f"{method:<8} {dim:>5} {memory:>10.0f} {overlap:>12.3f} "
+          f"{np.mean(latencies):>12.2f} {np.percentile(latencies, 95):>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200, help="Utilisateurs tirés au hasard")
+    parser.add_argument("--k", type=int, default=10, help="Taille du top-k évalué")
+    parser.add_argument("--dims", type=int, nargs="+", default=[32, 64, 128], help="Dimensions testées")
+    parser.add_argument("--methods", nargs="+", choices=["pca", "random"], default=["pca", "random"])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    recommender = ContentRecommender(data_loader)
+    embeddings = data_loader.load_articles_embeddings()
+    recommendable = data_loader.get_recommendable_articles()
+    reference = CandidateMatrix.build(recommendable, embeddings)
+
+    rng = np.random.default_rng(args.seed)
+    all_users = np.asarray(data_loader.get_all_users())
+    users = rng.choice(all_users, size=min(args.users, len(all_users)), replace=False)
+    queries = []
+    for user_id in users.tolist():
+        profile = recommender._user_profile(user_id)
+        if profile is not None:
+            queries.append((profile, data_loader.get_user_article_ids(user_id)))
+
+    expected, latencies = _evaluate(reference, queries, args.k)
+    print(f"{len(queries)} requêtes, k={args.k}")
+    print(f"{'méthode':<8} {'dim':>5} {'mémoire Mo':>10} {'recouvrement':>12} {'moyenne ms':>12} {'p95 ms':>10}")
+    _print_row("exact", reference.dim, reference.nbytes / 1024 ** 2, 1.0, latencies)
+
+    for method in args.methods:
+        for dim in args.dims:
+            projection = Projection.fit(embeddings, dim, method, seed=args.seed)
+            candidates = CandidateMatrix.build(recommendable, embeddings, projection=projection)
+            results, latencies = _evaluate(candidates, queries, args.k)
+            overlap = np.mean([
+                len(reference_ids & result_ids) / max(len(reference_ids), 1)
+                for reference_ids, result_ids in zip(expected, results)
+            ])
+            _print_row(method, candidates.dim, candidates.nbytes / 1024 ** 2, overlap, latencies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# backend/scripts/build_item_neighbors.py
+"""Calcul hors ligne de la table des voisins : les k articles les plus similaires
+à chaque article recommandable
+
+Produits matriciels par blocs répartis sur un pool de processus ; la table
+(article_id et scores) est écrite dans data/cache/item_neighbors/ et ouverte en
+mmap par l'API avec CONTENT_RETRIEVAL=neighbors. À relancer quand les articles
+recommandables changent (la table obsolète est ignorée).
+
+Usage (depuis backend/) :
+    python3 scripts/build_item_neighbors.py --k 50 --workers 0
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import argparse
+import logging
+import time
+
+from config import settings
+from data_loader import data_loader
+from recommenders import ContentRecommender
+from recommenders.neighbors import build_neighbor_table, NEIGHBORS_DIRNAME
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=settings.CONTENT_NEIGHBORS_K, help="Voisins par article")
+    parser.add_argument("--workers", type=int, default=0, help="Processus (0 = tous les cœurs)")
+    parser.add_argument("--block-rows", type=int, default=64, help="Lignes par produit matriciel")
+    args = parser.parse_args()
+
+    candidates = ContentRecommender(data_loader).get_candidates()
+
+    start = time.perf_counter()
+    build_neighbor_table(
+        settings.CACHE_PATH / NEIGHBORS_DIRNAME,
+        candidates.article_ids,
+        candidates.vectors,
+        candidates.fingerprint(),
+        k=args.k,
+        block_rows=args.block_rows,
+        workers=args.workers
+    )
+    print(f"✅ Table des voisins construite en {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# backend/scripts/build_user_profiles.py
+"""Précalcul hors ligne des profils de tous les utilisateurs (recommandation par contenu)
+
+Matrice creuse utilisateurs × articles (derniers clics, pondérés par ancienneté
+si PROFILE_DECAY_HALF_LIFE_HOURS > 0) multipliée par les embeddings ; la matrice
+des profils est écrite dans data/cache/user_profiles/ et lue en mmap par l'API
+(PROFILE_MATRIX_ENABLED). Un utilisateur qui a recliqué depuis voit son profil
+recalculé à la demande : relancer périodiquement.
+
+Usage (depuis backend/) :
+    python3 scripts/build_user_profiles.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import logging
+import time
+
+from data_loader import data_loader
+from recommenders import ContentRecommender
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def main():
+    data_loader.load_user_interactions()
+    data_loader.load_articles_embeddings()
+
+    start = time.perf_counter()
+    ContentRecommender(data_loader).build_profile_matrix()
+    print(f"✅ Matrice des profils construite en {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
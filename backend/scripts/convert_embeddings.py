@@ -0,0 +1,32 @@
+# backend/scripts/convert_embeddings.py
+"""Conversion unique des embeddings picklés en .npy mappable en mémoire
+
+Usage (depuis backend/) :
+    python3 scripts/convert_embeddings.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import logging
+from config import settings
+import embeddings_store
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def main():
+    pickle_path = settings.DATA_PATH / "articles_embeddings.pickle"
+    npy_path = settings.CACHE_PATH / embeddings_store.EMBEDDINGS_NPY_FILENAME
+
+    if not pickle_path.exists():
+        print(f"❌ Fichier source introuvable: {pickle_path}")
+        sys.exit(1)
+
+    embeddings_store.convert_pickle_to_npy(pickle_path, npy_path)
+    print(f"✅ Embeddings disponibles en mmap: {npy_path}")
+
+
+if __name__ == "__main__":
+    main()
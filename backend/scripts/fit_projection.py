@@ -0,0 +1,41 @@
+# backend/scripts/fit_projection.py
+"""Ajustement hors ligne de la projection des embeddings (scoring en dimension réduite)
+
+La projection est écrite dans data/cache/content_projection.npz et utilisée par
+l'API avec CONTENT_PROJECTION=pca|random et la même dimension. Comparer d'abord
+les dimensions avec scripts/benchmark_projection.py.
+
+Usage (depuis backend/) :
+    python3 scripts/fit_projection.py --method pca --dim 64
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import argparse
+import logging
+import time
+
+from config import settings
+from data_loader import data_loader
+from recommenders.projection import PROJECTION_FILENAME, load_or_fit
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--method", choices=["pca", "random"], default="pca")
+    parser.add_argument("--dim", type=int, default=settings.CONTENT_PROJECTION_DIM, help="Dimension cible")
+    args = parser.parse_args()
+
+    embeddings = data_loader.load_articles_embeddings()
+    start = time.perf_counter()
+    projection = load_or_fit(settings.CACHE_PATH / PROJECTION_FILENAME, embeddings, args.method, args.dim, refit=True)
+    print(f"✅ Projection {projection.method} {embeddings.shape[1]} → {projection.dim} "
+          f"ajustée en {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# backend/shared_data.py
+import sys
+from multiprocessing import shared_memory
+from typing import Dict, Optional
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Alignement des tableaux dans le segment (lignes de cache / SIMD)
+_ALIGNMENT = 64
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+class SharedDataPlane:
+    """Tableaux NumPy en lecture seule publiés dans un segment de mémoire partagée
+
+    Le processus parent construit les tableaux une fois et les copie dans un
+    unique segment ; chaque worker s'y attache via le manifeste (nom du segment,
+    dtype, forme et offset de chaque tableau) et obtient des vues sans copie.
+    Les clés sont de la forme "<groupe>/<colonne>" ; un groupe peut être relu
+    comme DataFrame.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, manifest: Dict, owner: bool):
+        self._shm = shm
+        self.manifest = manifest
+        self.owner = owner
+
+    @classmethod
+    def publish(cls, arrays: Dict[str, np.ndarray], meta: Optional[Dict] = None) -> 'SharedDataPlane':
+        """Crée le segment et y copie les tableaux (ordre des clés conservé)"""
+        layout = {}
+        size = 0
+        for key, array in arrays.items():
+            if array.dtype.hasobject:
+                raise ValueError(f"Colonne {key} de type objet : non publiable en mémoire partagée")
+            offset = _aligned(size)
+            layout[key] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+            size = offset + array.nbytes
+
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for key, array in arrays.items():
+            entry = layout[key]
+            target = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf, offset=entry["offset"])
+            target[...] = array
+
+        manifest = {"segment": shm.name, "size": size, "arrays": layout, "meta": meta or {}}
+        logger.info(f"🧩 Données publiées en mémoire partagée: {shm.name} "
+                    f"({len(layout)} tableaux, {size / 1024 ** 2:.1f} Mo)")
+        return cls(shm, manifest, owner=True)
+
+    @classmethod
+    def attach(cls, manifest: Dict) -> 'SharedDataPlane':
+        """S'attache au segment publié par le processus parent"""
+        if sys.version_info >= (3, 13):
+            # Le parent reste seul responsable de la libération du segment
+            shm = shared_memory.SharedMemory(name=manifest["segment"], track=False)
+        else:
+            # Les workers lancés par uvicorn (spawn) partagent le resource_tracker
+            # du parent : l'attache n'entraîne pas de libération à leur sortie
+            shm = shared_memory.SharedMemory(name=manifest["segment"])
+        return cls(shm, manifest, owner=False)
+
+    @property
+    def meta(self) -> Dict:
+        return self.manifest["meta"]
+
+    def has(self, key: str) -> bool:
+        return key in self.manifest["arrays"]
+
+    def array(self, key: str) -> np.ndarray:
+        """Vue en lecture seule sur un tableau du segment"""
+        entry = self.manifest["arrays"][key]
+        array = np.ndarray(
+            tuple(entry["shape"]), dtype=np.dtype(entry["dtype"]),
+            buffer=self._shm.buf, offset=entry["offset"]
+        )
+        array.flags.writeable = False
+        return array
+
+    def group(self, prefix: str) -> Dict[str, np.ndarray]:
+        """Tableaux d'un groupe, indexés par nom de colonne"""
+        start = f"{prefix}/"
+        return {
+            key[len(start):]: self.array(key)
+            for key in self.manifest["arrays"]
+            if key.startswith(start)
+        }
+
+    def frame(self, prefix: str) -> pd.DataFrame:
+        """DataFrame sans copie sur les colonnes d'un groupe publié par `frame_arrays`"""
+        columns = self.group(prefix)
+        index = self.array(f"{prefix}.index") if self.has(f"{prefix}.index") else None
+        # copy=False : une colonne par bloc, pas de consolidation (donc pas de copie)
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    def close(self):
+        """Détache les vues du processus courant"""
+        self._shm.close()
+
+    def unlink(self):
+        """Libère le segment (processus parent uniquement)"""
+        if self.owner:
+            self._shm.unlink()
+            logger.info(f"🧹 Mémoire partagée libérée: {self._shm.name}")
+
+
+def frame_arrays(prefix: str, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Colonnes (et index s'il n'est pas un RangeIndex 0..n-1) d'un DataFrame à publier"""
+    arrays = {f"{prefix}/{column}": df[column].to_numpy() for column in df.columns}
+    if not df.index.equals(pd.RangeIndex(len(df))):
+        arrays[f"{prefix}.index"] = df.index.to_numpy()
+    return arrays
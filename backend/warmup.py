@@ -0,0 +1,114 @@
+# backend/warmup.py
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Préchauffage au démarrage : construit données, index et recommandeurs
+    avant que le trafic soit routé vers l'instance
+
+    Les phases s'exécutent dans l'ordre ; chacune est chronométrée et son état
+    exposé par /ready. Une phase en échec n'interrompt pas les suivantes mais
+    l'instance n'est alors pas déclarée prête : les phases en échec sont
+    relancées en arrière-plan avec un délai croissant (retry_delay_s, doublé à
+    chaque essai jusqu'à max_retry_delay_s), et l'instance devient prête dès
+    qu'elles ont toutes réussi. Avec retry_delay_s=0, un échec impose un
+    redémarrage.
+    """
+
+    def __init__(self, enabled: bool = True, retry_delay_s: float = 5.0, max_retry_delay_s: float = 300.0):
+        self._phases: List[Tuple[str, Callable[[], None]]] = []
+        self._report: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.state = "pending" if enabled else "disabled"
+        self.started_at: Optional[datetime] = None
+        self.total_s: Optional[float] = None
+        self.retry_delay_s = retry_delay_s
+        self.max_retry_delay_s = max_retry_delay_s
+
+    def add_phase(self, name: str, action: Callable[[], None]):
+        self._phases.append((name, action))
+        self._report[name] = {"state": "pending", "duration_s": None, "error": None, "attempts": 0}
+
+    def run(self):
+        """Exécute toutes les phases (bloquant)"""
+        with self._lock:
+            if self.state != "pending":
+                return
+            self.state = "running"
+
+        self.started_at = datetime.now()
+        start = time.perf_counter()
+        logger.info(f"🔥 Préchauffage: {len(self._phases)} phases")
+
+        failed = False
+        for name, action in self._phases:
+            if not self._run_phase(name, action):
+                failed = True
+
+        self.total_s = round(time.perf_counter() - start, 3)
+        self.state = "failed" if failed else "ready"
+        logger.info(f"{'⚠️' if failed else '✅'} Préchauffage terminé en {self.total_s:.1f}s ({self.state})")
+
+        if failed and self.retry_delay_s > 0:
+            threading.Thread(target=self._retry_failed, name="warmup-retry", daemon=True).start()
+
+    def _run_phase(self, name: str, action: Callable[[], None]) -> bool:
+        """Exécute une phase et met à jour son rapport ; True si elle a réussi"""
+        phase = self._report[name]
+        phase["state"] = "running"
+        phase["attempts"] += 1
+        phase_start = time.perf_counter()
+        try:
+            action()
+            phase["state"] = "done"
+            phase["error"] = None
+        except Exception as e:
+            phase["state"] = "failed"
+            phase["error"] = str(e)
+            logger.error(f"❌ Préchauffage {name}: {e}")
+        finally:
+            phase["duration_s"] = round(time.perf_counter() - phase_start, 3)
+        logger.info(f"⏱️ Préchauffage {name}: {phase['duration_s']:.3f}s")
+        return phase["state"] == "done"
+
+    def _retry_failed(self):
+        """Relance les phases en échec, dans l'ordre, avec un délai croissant"""
+        delay = self.retry_delay_s
+        while True:
+            failed = [(name, action) for name, action in self._phases if self._report[name]["state"] == "failed"]
+            if not failed:
+                break
+            logger.info(f"🔁 Préchauffage: nouvel essai de {len(failed)} phase(s) dans {delay:g}s")
+            time.sleep(delay)
+            for name, action in failed:
+                self._run_phase(name, action)
+            delay = min(delay * 2, self.max_retry_delay_s)
+
+        self.state = "ready"
+        logger.info("✅ Préchauffage rétabli : toutes les phases ont réussi")
+
+    def start_background(self) -> threading.Thread:
+        """Lance le préchauffage dans un thread : /health répond pendant ce temps"""
+        thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def is_ready(self) -> bool:
+        """Prêt si toutes les phases ont réussi (ou si le préchauffage est désactivé)"""
+        return self.state in ("ready", "disabled")
+
+    def report(self) -> Dict:
+        """État global et durée de chaque phase"""
+        return {
+            "ready": self.is_ready(),
+            "state": self.state,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "total_s": self.total_s,
+            "phases": {name: dict(phase) for name, phase in self._report.items()}
+        }